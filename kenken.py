@@ -6,41 +6,81 @@
  That is to discard the node in the state which conflicts with the rule that all elements in a row are unique.
  e.g. Discard the node [[1,1],[0,0]] in the process of generating the child nodes of the node [[1, 0], [0, 0]]
  
+ The cage of the square given a number is also checked in every child node, rather than only in the goal test.
+ If all squares of the cage have a number, they must satisfy the cage's operator,
+ otherwise there must be some numbers for the blank squares of the cage which satisfy it, or the child node is discarded.
+ 
+ The tuples of numbers satisfying every cage are computed only once for every (operator, value, amount of squares, size),
+ and shared by all solvers, see KenKenSolver.getCageCombinations().
+ A square is only given the numbers which appear at its place in those tuples, e.g. 1 or 5 in a cage of "*", 5 with two squares.
+ 
+ Before those tuples are checked, a cage of "+" or "*" is checked by the bounds of its blank squares,
+ e.g. the running sum plus the smallest possible numbers of the blank squares must not exceed the value,
+ and the running product must divide the value.
+ 
+ solve("backtracking") searches depth first in one grid, which is changed in place and changed back when a number fails,
+ with the numbers used in every row and col recorded as bitmasks, so that no child node is copied and the memory is O(n^2).
+ 
  The example and the runtime of solving 3X3, 4X4, 5X5 KenKen games are at the end of the program.
 """
 
+import time
+from collections import deque
+from functools import lru_cache
+from itertools import product
+
 class KenKenSolver:
   """ A KenKen Solver """
 
   def __init__(self, size):
     self.size = size
     self._goal = []
-    self.operatorAction = {
-      "+": self.operator_plus,
-      "-": self.operator_minus,
-      "*": self.operator_multiply,
-      "/": self.operator_divide,
-    }
+    # The index of the goal whose cage has the square (row, col), counting from 0
+    self._cage_of = {}
+    self.operatorAction = self.OPERATORS
+    # The possible numbers of every square, which are narrowed by the cages set by setGoal()
+    self._domains = []
+    for i in range(size):
+      self._domains.append([])
+      for j in range(size):
+        self._domains[-1].append(list(range(1, size+1)))
     self.initial_state = []
     for i in range(size):
       self.initial_state.append([])
       for j in range(size):
         self.initial_state[-1].append(0)
+    self._level_stats = []
   
   def setGoal(self, operator, value, elements):
     self._goal.append([operator, value, elements])
+    combinations = self.getCageCombinations(operator, value, len(elements), self.size)
+    for k in range(len(elements)):
+      x, y = divmod(elements[k]-11, 10)
+      self._cage_of[(x, y)] = len(self._goal) - 1
+      self._domains[x][y] = sorted(set(t[k] for t in combinations))
+
+  @staticmethod
+  @lru_cache(maxsize = 1024)
+  def getCageCombinations(operator, value, cells, size):
+    """ Return the tuple of all the tuples of cells numbers from 1 to size which satisfy the operator and value of a cage.
+    The tables are cached and shared by all solvers."""
+    check = KenKenSolver.OPERATORS[operator]
+    return tuple(t for t in product(range(1, size+1), repeat = cells) if check(value, t))
       
-  def operator_plus(self, value, elements):
+  @staticmethod
+  def operator_plus(value, elements):
     if sum(elements) == value:
       return True
     return False
 
-  def operator_minus(self, value, elements):
+  @staticmethod
+  def operator_minus(value, elements):
     if abs(elements[0] - elements[1]) == value:
       return True 
     return False
   
-  def operator_multiply(self, value, elements):
+  @staticmethod
+  def operator_multiply(value, elements):
     result = 1
     for x in elements:
       result = result * x
@@ -48,7 +88,8 @@ class KenKenSolver:
       return True
     return False
   
-  def operator_divide(self, value, elements):
+  @staticmethod
+  def operator_divide(value, elements):
     if elements[0] > elements[1]:
       result = elements[0] / elements[1]
     else:
@@ -56,7 +97,53 @@ class KenKenSolver:
     if result == value:
       return True
     return False
-      
+
+  def isCageInBounds(self, node, goal):
+    """ Return False if a cage of "+" or "*" of goal cannot be satisfied in node because of the bounds of its numbers,
+    namely if the value minus the running sum, or the value divided by the running product, is not between
+    the sum, or the product, of the smallest and of the largest possible numbers of the blank squares.
+    The running product must also divide the value. Return True for the other operators."""
+    operator, value, elements = goal
+    if operator == "+":
+      result, low, high = 0, 0, 0
+      for e in elements:
+        x, y = divmod(e-11, 10)
+        if node[x][y] != 0:
+          result = result + node[x][y]
+        else:
+          low = low + self._domains[x][y][0]
+          high = high + self._domains[x][y][-1]
+      return low <= value - result <= high
+    if operator == "*":
+      result, low, high = 1, 1, 1
+      for e in elements:
+        x, y = divmod(e-11, 10)
+        if node[x][y] != 0:
+          result = result * node[x][y]
+        else:
+          low = low * self._domains[x][y][0]
+          high = high * self._domains[x][y][-1]
+      return value % result == 0 and low <= value // result <= high
+    return True
+
+  def isCagePossible(self, node, goal):
+    """ Return True if all squares of the cage of goal have a number satisfying the operator,
+    or if some numbers from 1 to size can be put into the blank squares of the cage to satisfy it,
+    namely if some tuple of KenKenSolver.getCageCombinations() agrees with the numbers in the cage."""
+    operator, value, elements = goal
+    filled = []
+    for k in range(len(elements)):
+      x, y = divmod(elements[k]-11, 10)
+      if node[x][y] != 0:
+        filled.append((k, node[x][y]))
+    for t in self.getCageCombinations(operator, value, len(elements), self.size):
+      for k, number in filled:
+        if t[k] != number:
+          break
+      else:
+        return True
+    return False
+
   def isGoal(self, node):
     range_size = range(self.size)
     element_size = []
@@ -86,7 +173,7 @@ class KenKenSolver:
     
     child_nodes = []
     
-    for k in range(self.size):
+    for number in self._domains[i][j]:
       ch = []
       
       # copy parent_node
@@ -96,7 +183,7 @@ class KenKenSolver:
           ch[l].append(parent_node[l][m])
           
       # generate child_node
-      ch[i][j] = k + 1
+      ch[i][j] = number
       
       # check validity of child_node
       # check the uniqueness of the elements in a row
@@ -117,10 +204,54 @@ class KenKenSolver:
               if tmp.count(x) > 1:
                 discard = True
                 break
+        # check the cage of the square
+        if discard == False and self.isCageValid(ch, i, j) == False:
+          discard = True
         if discard == False:
           child_nodes.append(ch)
     return child_nodes
 
+  def isCageValid(self, node, i, j):
+    """ Return False if the cage of the square (i, j) cannot be satisfied any more after a number is put into the square in node."""
+    if (i, j) not in self._cage_of:
+      return True
+    goal = self._goal[self._cage_of[(i, j)]]
+    return self.isCageInBounds(node, goal) and self.isCagePossible(node, goal)
+
+  def solveBacktracking(self):
+    """ Solve the game by depth-first backtracking in one grid, which is changed in place and changed back when a number fails.
+    The numbers used in every row and col are recorded as bitmasks, in which the bit (1 << k) means the number k.
+    Return the solution, or [] if there is no solution."""
+    node = []
+    for row in self.initial_state:
+      node.append(list(row))
+    rows = [0] * self.size
+    cols = [0] * self.size
+    if self.putNext(node, rows, cols, 0):
+      return node
+    return []
+
+  def putNext(self, node, rows, cols, iter_times):
+    """ Put a number into the square decided by iter_times, in the same order as getChildNodes(), and into all the squares after it.
+    Return True if the grid is filled, otherwise return False with the squares blank again."""
+    i, j = divmod(iter_times, self.size)
+    if i == self.size:
+      return True
+    for number in self._domains[i][j]:
+      bit = 1 << number
+      if rows[i] & bit or cols[j] & bit:
+        continue
+      node[i][j] = number
+      if self.isCageValid(node, i, j):
+        rows[i] |= bit
+        cols[j] |= bit
+        if self.putNext(node, rows, cols, iter_times + 1):
+          return True
+        rows[i] &= ~bit
+        cols[j] &= ~bit
+    node[i][j] = 0
+    return False
+
   
   def output(self, node):
     for i in range(self.size):
@@ -129,30 +260,54 @@ class KenKenSolver:
         s = s + '%d'%node[i][j] + ' '
       print(s)
   
-  def solve(self):
-    frontier = [self.initial_state]
-    i = 0
-    depth = 0
-    max_depth = self.size * self.size
-    print(max_depth)
-    while(frontier):
-      node = frontier.pop(0)
+  def solve(self, strategy = "bfs"):
+    """ Solve the game by BFS, or by solveBacktracking() if strategy == "backtracking".
+    Return the solution, or [] if there is no solution."""
+    if strategy == "backtracking":
+      return self.solveBacktracking()
+    if strategy != "bfs":
+      raise TypeError("A illegal search strategy " + strategy + " is given.")
 
-      if depth == max_depth:
-        if self.isGoal(node) == True:
-          return node
-      
-      for ch in self.getChildNodes(node, depth):
-        frontier.append(ch)
-          
-      if i == 0:
-        print(depth)
-        depth = depth + 1
-        i = len(frontier)
-      else:
-        i = i - 1
+    # BFS is level-synchronous: all the nodes of a depth are taken from the queue before their child nodes are.
+    frontier = deque([self.initial_state])
+    max_depth = self.size * self.size
+    self._level_stats = []
+    for depth in range(max_depth):
+      start_time = time.perf_counter()
+      expanded = len(frontier)
+      next_frontier = deque()
+      while frontier:
+        node = frontier.popleft()
+        for ch in self.getChildNodes(node, depth):
+          next_frontier.append(ch)
+      frontier = next_frontier
+      self._level_stats.append({
+        "depth": depth,
+        "frontier": expanded,
+        "children": len(frontier),
+        "time": time.perf_counter() - start_time,
+      })
+      if not frontier:
+        return []
 
+    for node in frontier:
+      if self.isGoal(node) == True:
+        return node
     return []
+
+  def getLevelStats(self):
+    """ Return the statistics of every depth of the last BFS by solve(), as a list of dictionaries
+    {"depth": depth, "frontier": amount of nodes of the depth, "children": amount of child nodes kept, "time": time used}."""
+    return self._level_stats
+
+
+# The operators of the cages, which are used by KenKenSolver.getCageCombinations() shared by all solvers
+KenKenSolver.OPERATORS = {
+  "+": KenKenSolver.operator_plus,
+  "-": KenKenSolver.operator_minus,
+  "*": KenKenSolver.operator_multiply,
+  "/": KenKenSolver.operator_divide,
+}
     
       
 if __name__ == "__main__":
@@ -219,12 +374,11 @@ if __name__ == "__main__":
   RunTime: 575.798663s
   """
   
-  import time
-  start = time.clock()
+  start = time.perf_counter()
   
   goal = solver.solve()
   
-  end = time.clock()
+  end = time.perf_counter()
   
   if goal:
     print("Solution:")
@@ -233,5 +387,7 @@ if __name__ == "__main__":
     print("No Solution")
     
   print("RunTime: %fs"%(end-start))
+  for level in solver.getLevelStats():
+    print("Depth %d"%level["depth"] + ": %d"%level["frontier"] + " nodes, %d"%level["children"] + " child nodes kept, %fs"%level["time"])
     
  
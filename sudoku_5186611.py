@@ -10,6 +10,13 @@ This is a sudoku solver written by Pei Xu (ID#: 5186611) using BFS.
    CD to the folder that contains this file whose name is sudoku_5186611.py
    Input "python sudoku_5186611.py", and press the enter or return button
    Then the program will automatically run with the three examples given in the assignment.
+
+   To solve a large file of puzzles, one puzzle per line, and write the solutions as JSON lines, use
+     python -c "import sudoku_5186611 as s; s.solve_stream('puzzles.txt', 'solutions.jsonl', method = 3, propagation = 2)"
+   '-' can be given instead of the file names for stdin and stdout.
+   The puzzles can also be written once into a binary corpus, PuzzleCorpus.create('puzzles.sdk', read_puzzles('puzzles.txt')),
+   which is read via mmap, so that any puzzle or any slice of puzzles is read by index without parsing the text again.
+   If store = SolutionStore('solutions.db') is given to solve_stream() or solve_many(), the puzzles solved before are looked up rather than solved again.
    
 =============================================================================================================
  
@@ -30,6 +37,8 @@ This is a sudoku solver written by Pei Xu (ID#: 5186611) using BFS.
   
   In the class SudokuSolver, the class Node is used to represent a node.
   It has a one-dimesional list variable _state to store its state, and we can get the variable via Node.getState().
+  The state is actually stored as a bytearray, so that a Sudoku game can have at most 255 x 255 squares.
+  Node.getState() returns a copy of it as a list, and Node.getStateView() and Node.getSquare() read it without copying.
   In the list, the squares in a sudoku game are ordered from left to right and top to bottom.
   e.g. For a Sudoku game having n x n squares, the node's state
         [ N11, N12, N13, ..., N1n,
@@ -39,6 +48,13 @@ This is a sudoku solver written by Pei Xu (ID#: 5186611) using BFS.
         represents a state in which
           Nij (i belongs to 1 to n, and j belongs to 1 to n) is the number at the square
           locating at the joint of the row i and col j.
+
+  If SudokuSolver.setCompactNodes(True) is called, the class CompactNode is used instead.
+  A compact node only stores its parent, the square and the number put, and its depth,
+  and its state is materialized only when it is needed into a scratch node shared by the whole search tree.
+  For the example with 100 squares, the memory used is reduced from about 145MB to about 50MB.
+  Alternatively, if SudokuSolver.setMemoryBudget(budget) is called, the frontier of BFS keeps at most about budget nodes in memory
+  and spills the others into temporary files, which are read back in FIFO order, see SpillingFrontier.
           
 =============================================================================================================
 
@@ -76,12 +92,32 @@ This is a sudoku solver written by Pei Xu (ID#: 5186611) using BFS.
       [5], 2, [4, 5], [4, 5, 6], 3, 1
   We store it to a dictionary variable { 3 : [3, 6], 4 : [2, 3], 6 : [2], ... }
   So that we can only generate two (rather than nine) child nodes from the initial node, the two nodes whose 3rd square respectively has the number 3 and 6.
+  The possible numbers are actually stored as a bitmask, one int per square, in which the bit (1 << (k-1)) is set if k is a possible number.
+  e.g. [3, 6] is stored as 0b100100. The numbers used in every row, col and subset are recorded in the same way,
+  so that checking if a number can be put into a square is a single AND operation.
     This pruning is used in the function Node.assignInitialState()
   
   (3) Discard the node immediately when it is generated if the node's state conflicts with the rule that in a sudoku game having n x n square, squares in a row, a column or a subset have different numbers that must belong to the set 1 to n.
   That is to say, a node whose state conflicts with that rule may be generated, but it would be discarded immediately and the child nodes of that illegal node would not be generated.
     This pruning is used in the function SudokuSolver.solve()
 
+  (4) Forward checking, which is used only if SudokuSolver.setForwardChecking(True) is called.
+  A child node is generated only for the numbers that are not used in the row, the col and the subset of the square in the parent's state,
+  and a child node is not generated if putting the number makes any remaining blank square have no possible number.
+  So that no node needs to be discarded by the pruning (3).
+    This pruning is used in the function Node.childNodes()
+
+  (5) Constraint propagation, which is used only if SudokuSolver.setPropagation(1) is called.
+  After a node is generated, and also for the initial node, the numbers that can be deduced from its state are put into it until no more number can be deduced:
+  a blank square having only one possible number (naked single) is given that number,
+  and a number which can be put into only one blank square in a row, a col or a subset (hidden single) is put into that square.
+  A node is discarded if a blank square has no possible number or a number has no square in a row, a col or a subset.
+  SudokuSolver.setPropagation(2) also removes possible numbers by naked/hidden pairs, pointing pairs and box/line reduction,
+  and SudokuSolver.setPropagation(3) also by naked/hidden triples and X-wing.
+  Every rule can be enabled or disabled by SudokuSolver.setPropagationRule(),
+  and the amount of eliminations made by every rule and the time used are returned by SudokuSolver.getPropagationStats().
+    This pruning is used in the function Node.propagate()
+
 =============================================================================================================
 
   Modifications Made to BFS:
@@ -101,6 +137,35 @@ This is a sudoku solver written by Pei Xu (ID#: 5186611) using BFS.
   Lots of examples were tested. And it proved that this modification cannot works well frequently.
   Testing data are at the end of this file.
 
+  (3) Because the modification (2) sorts the squares only once according to their initial possible numbers,
+  the order of squares never reacts to the numbers put during the search.
+  If method == 3 is given to SudokuSolver.solve(), every node decides by itself which square its child nodes will be put a number into,
+  namely the blank square having the fewest possible numbers in the node's own state.
+  If several squares have the same amount of possible numbers, the one having the most blank squares in its row, col and subset is chosen.
+  Because only the possible numbers in the node's own state are tried, no child node needs to be discarded in this way.
+  This modification is used in the function Node.selectNextSquare()
+
+  (4) If method == 4 is given to SudokuSolver.solve(), BFS is not used at all.
+  The game is encoded as an exact cover problem, in which every square, and every number in every row, col and subset, must be covered exactly once,
+  and solved by Knuth's Algorithm X with Dancing Links. Its memory does not grow with the amount of generated nodes.
+  This modification is used in the function SudokuSolver.solveDancingLinks() and the class DancingLinks
+
+  (5) The frontier is a FIFO queue for BFS by default, but the parameter strategy of SudokuSolver.solve() can change it into
+  a stack for DFS ('dfs'), a priority queue for best-first search ('best') or a bounded queue for beam search ('beam'),
+  in which the nodes are ordered by the amount of blank squares or of possible numbers in their state.
+  DFS keeps only dozens of nodes in the frontier, rather than millions of nodes kept by BFS for the hard games.
+  This modification is used in the function SudokuSolver.createFrontier()
+
+  (6) If strategy == 'vector' is given to SudokuSolver.solve() with method 1 or 2, the nodes of every depth are kept in one NumPy array rather than as Node objects.
+  Because the order of squares is static, all the nodes of a depth put a number into the same square, so their child nodes are generated and examined at once.
+  The 100-square example in the assignment is solved in less than one second, with the same nodes generated and discarded as BFS. numpy is needed only for it.
+  This modification is used in the function SudokuSolver.solveVectorized()
+
+  (7) If SudokuSolver.setSolutionCache() is called, a game is first transformed into its canonical form, the smallest state among the games equivalent to it
+  by relabeling the numbers, permuting rows and cols in bands and stacks, permuting bands and stacks, and transposing if the subsets are square.
+  If the canonical form has been solved, the cached solution is transformed back within a millisecond rather than searching again.
+  This modification is used in the function canonicalize() and the class SolutionCache
+
 =============================================================================================================
 
    Question:
@@ -143,6 +208,17 @@ nodes within your code or derive a theoretical bound.
 =============================================================================================================
 """
 
+import heapq
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from collections import OrderedDict, deque
+from itertools import chain, combinations, groupby, islice, permutations, product, tee
+from math import factorial
+
 
 class SudokuSolver:
   """ This is a sudoku solver written by Pei Xu for the assignment using BFS."""
@@ -155,6 +231,12 @@ class SudokuSolver:
          and the 3rd square in the 4th row has the number of 3.
     """
     self.showProgressRate(0)
+    self.setForwardChecking(False)
+    self.setPropagation(0)
+    self.setCompactNodes(False)
+    self.setMemoryBudget(None)
+    self.setSolutionCache(None)
+    self.setSolutionStore(None)
     if size:
       self.setSize(size)
     else:
@@ -169,6 +251,7 @@ class SudokuSolver:
       side = size.split('x')
       self._offset = (int(side[0]), int(side[1]))
       self._size = self._offset[0] * self._offset[1]
+      self._geometry = Geometry.get(self._offset)
   
   def setRestraint(self, value, position):
     """ Set restraint for the Sudoku game.
@@ -195,7 +278,33 @@ class SudokuSolver:
          and the 3rd square in the 4th row has the number of 3."""
     for k in restraints.keys():
       self.setRestraint(restraints[k], k)
+
+  def setPuzzle(self, puzzle):
+    """ Set the restraints from a puzzle string having one character for every square, ordered from left to right and top to bottom.
+    '.' or '0' means a blank square, '1' to '9' mean the numbers 1 to 9, and 'A' to 'Z' (or 'a' to 'z') mean the numbers 10 to 35.
+    e.g. "4...3.......6..8.. ..." for a game with 81 squares.
+    The puzzle can also be bytes having one byte for every square, 0 for a blank square, e.g. a record of PuzzleCorpus."""
+    if len(puzzle) != self._size * self._size:
+      raise TypeError("A puzzle of %d"%len(puzzle) + " squares is given for a game of %d"%(self._size * self._size) + " squares.")
+    self._restraints = {}
+    for i in range(len(puzzle)):
+      if isinstance(puzzle, str):
+        value = 0 if puzzle[i] == '.' else int(puzzle[i], 36)
+      else:
+        value = puzzle[i]
+      if value > self._size:
+        raise TypeError("A illegal number %d"%value + " is given in the puzzle.")
+      if value != 0:
+        self._restraints[i] = value
   
+  def getSize(self):
+    """ Return the size of the game, e.g. '3x3'."""
+    return "%d"%self._offset[0] + "x%d"%self._offset[1]
+
+  def getPuzzle(self):
+    """ Return the puzzle string of the restraints, in the format of SudokuSolver.setPuzzle() with '.' for a blank square."""
+    return ''.join(format_number(self._restraints.get(pos, 0)) for pos in range(self._size * self._size))
+
   def isSolution(self, state):
     """ This function is useless in the class.
     Because there is no need to check if a node with the state in which all squares has a non-zero number is a solution
@@ -239,66 +348,103 @@ class SudokuSolver:
     
 
   def isLegal(self, node):
-    """ This function is used to prune search tree during producing child nodes.""" 
-    state = node.getState()
+    """ This function is used to prune search tree during producing child nodes.
+    The number put into the node's square is checked against the tables of the used numbers carried by the node's parent,
+    so that the check is done in constant time without copying or scanning the node's state.""" 
+    rows, cols, boxes = node.getParentTables()
     position = node.getPosition()
-    x, y = divmod(position + 1, self._size)
-    size_range = range(self._size)
     
     # No need to check if the number given beforehand is the same to the number at the corresponding square in the state.
     # Because any node is produced according to the number given beforehand.
 
-    # Check if there are only numbers 1 to N in a row
-    if y == 0:
-      start = (x-1)*self._size
-    else:
-      start = x * self._size
-    end = start + self._size
-    if state[start:end].count(state[position]) > 1:
-      return False
-    # Check if there are only numbers 1 to N in a col
-    if y == 0:
-      y_m = self._size - 1
-    else:
-      y_m = y-1
-    for i in size_range:
-      pos = i * self._size + y_m
-      if state[pos] == state[position]:
-        if pos != position:
-          return False
-    # Check if there are only numbers 1 to N in a subset
-    if y == 0:
-      y = self._size
-    else:
-      x = x + 1
-    i, j = divmod(x, self._offset[0])
-    l, m = divmod(y, self._offset[1])
-    if j == 0:
-      i = i - 1
-    if m == 0:
-      l = l -1
-    start = i * self._offset[0] * self._size + l * self._offset[1]
-    subset = []
-    for i1 in range(self._offset[1]):
-      for j1 in range(self._offset[0]):
-        pos = start + j1 * self._size + i1
-        if state[pos] == state[position]:
-          if pos != position:
-            return False
-      
-    return True
+    # Check if the number is used in the row, the col or the subset
+    geometry = self._geometry
+    used = rows[geometry.row_of[position]] | cols[geometry.col_of[position]] | boxes[geometry.box_of[position]]
+    return used & (1 << (node.getNumber() - 1)) == 0
     
   def generateInitialNode(self, method):
-    """Generate the initial node with the initial state"""
-    return Node([self._size, self._offset[0], self._offset[1], self._restraints, method])
+    """Generate the initial node with the initial state.
+    Return None if the numbers given beforehand conflict with each other,
+    or if a contradiction with the rule of Sudoku is found in the initial state by the propagation."""
+    node = Node([self._size, self._offset[0], self._offset[1], self._restraints, method])
+    if node.hasConflict():
+      return None
+    if self._compact_nodes:
+      if self._propagation_rules:
+        raise TypeError("Compact nodes cannot be used together with the propagation.")
+      return CompactNode(node)
+    if self._propagation_rules and not node.propagate(self._propagation_rules, self._propagation_stats):
+      return None
+    return node
   
-  def solve(self, method = 2, test = False):
+  def solve(self, method = 2, test = False, strategy = 'bfs', heuristic = 'blanks', beam_width = 100):
     """ Solve a Sudoku game using BFS and according to the restraints and size given beforehand.
     Use TREE-SEARCH here, because no cyclical path exists during producing child nodes.
+    The parameter method decides the order of squares that will be put a number:
+      1: according to the initial possible numbers of the squares, namely the modification (2) to BFS;
+      2: from left to right and top to bottom;
+      3: the square having the fewest possible numbers in every node's state, namely the modification (3) to BFS.
+    If method == 4, BFS is not used and the game is solved by Dancing Links, see SudokuSolver.solveDancingLinks().
+    The parameter strategy decides the order of nodes taken from the frontier, see SudokuSolver.createFrontier(),
+    or if strategy == 'vector', the nodes of every depth are expanded at once, see SudokuSolver.solveVectorized().
+    If a solution cache is set by SudokuSolver.setSolutionCache(), it is looked up before searching,
+    and a game equivalent to a solved one is answered with no node generated.
+    If a solution store is set by SudokuSolver.setSolutionStore(), it is looked up next,
+    and a game solved before is answered with the statistics recorded when it was solved.
+    A solution found by any of them is put into the other ones, but "no solution" is not stored if it is given by the beam search,
+    which may miss solutions.
     Return the node's state if a solution is found, otherwise return []."""
-    
+    key = None
+    if self._solution_cache is not None:
+      start_time = time.perf_counter()
+      key, transform = canonicalize(self._restraints, self._offset)
+      state = self._solution_cache.get(key, transform)
+      if state is not None:
+        current_time = time.perf_counter()
+        result = [state, current_time-start_time, 0, 0]
+        if self._solution_store is not None and self._solution_store.get(self.getSize(), self.getPuzzle()) is None:
+          self._solution_store.put(self.getSize(), self.getPuzzle(), result)
+        if self._show_progress_rate > 0:
+          self.showSolution(state, current_time-start_time, 0, 0)
+        if test == False:
+          return state
+        return result
+    if self._solution_store is not None:
+      result = self._solution_store.get(self.getSize(), self.getPuzzle())
+      if result is not None:
+        if key is not None and result[0]:
+          self._solution_cache.put(key, transform, result[0])
+        if self._show_progress_rate > 0:
+          self.showSolution(result[0], result[1], result[2], result[3])
+        if test == False and result[0]:
+          return result[0]
+        return result
+
+    if method == 4:
+      result = self.solveDancingLinks(True)
+    elif strategy == 'vector':
+      result = self.solveVectorized(method, True)
+    else:
+      result = self.solveBFS(method, True, strategy, heuristic, beam_width)
+    if key is not None and result[0]:
+      self._solution_cache.put(key, transform, result[0])
+    if self._solution_store is not None and (result[0] or method == 4 or strategy != 'beam'):
+      self._solution_store.put(self.getSize(), self.getPuzzle(), result)
+    if test == False and result[0]:
+      return result[0]
+    return result
+
+  def solveBFS(self, method = 2, test = False, strategy = 'bfs', heuristic = 'blanks', beam_width = 100):
+    """ Solve a Sudoku game using BFS and according to the restraints and size given beforehand, see SudokuSolver.solve().
+    Return the same as SudokuSolver.solve()."""
+    start_time = time.perf_counter()
+    self._propagation_stats = dict((rule, [0, 0.0]) for rule in self._propagation_rules)
+
     # Put the initial node into the frontier list.
-    frontier = [self.generateInitialNode(method)]
+    frontier = self.createFrontier(strategy, heuristic, beam_width)
+    initial_node = self.generateInitialNode(method)
+    if initial_node is not None:
+      frontier.push(initial_node)
     
     # Record the amount of generated nodes
     amount_generated_nodes = 1
@@ -306,19 +452,17 @@ class SudokuSolver:
     
     # Show progress rate
     if self._show_progress_rate > 0:
-      import time
-      start_time = time.clock()
       if self._show_progress_rate > 1:
-        depth = frontier[0].getDepth()
+        depth = -1
         total_squares = self._size*self._size
         left_squares = total_squares - len(self._restraints)
         print("Initial Node has been generated. %d"%left_squares + " squares needed to be given a number.")
       
     while(frontier):
-      current_node = frontier.pop(0)
+      current_node = frontier.pop()
       # Show progress rate
       if self._show_progress_rate > 1:
-        current_time = time.clock()
+        current_time = time.perf_counter()
         if current_node.getDepth() != depth:
           print("Putting number into the %d"%current_node.getPosition() + "th square. %d"%left_squares + "/%d"%total_squares + " squares left.")
           print("%d"%amount_generated_nodes + " nodes have been generated. %d"%discard_generated_nodes + " nodes have been discard.")
@@ -327,12 +471,12 @@ class SudokuSolver:
           left_squares = left_squares - 1
 
       # if there is any zero term in a node's state, that node must have child nodes regardless of the legality of those child nodes.
-      if 0 in current_node.getState():
-        child_nodes = current_node.childNodes()
+      if not current_node.isComplete():
+        child_nodes = current_node.childNodes(self._forward_checking)
         for ch in child_nodes:
           amount_generated_nodes = amount_generated_nodes + 1
-          if self.isLegal(ch):
-            frontier.append(ch)
+          if self.isLegal(ch) and (not self._propagation_rules or ch.propagate(self._propagation_rules, self._propagation_stats)):
+            frontier.push(ch)
           else:
             discard_generated_nodes = discard_generated_nodes + 1
       else:
@@ -341,54 +485,747 @@ class SudokuSolver:
         # That is to say, if all squares in the state of the node produced by Node.childNodes() has a non-zero number, the node must be the solution
         #if self.isSolution(current_node.getState()):
         
+        current_time = time.perf_counter()
         # Show progress rate
         if self._show_progress_rate > 0:
-          current_time = time.clock()
-          print("Solution was found!")
-          s1 = ''
-          s0 = ''
-          for i in range(self._size):
-            for j in range(self._size):
-              if i*self._size + j in self._restraints.keys():
-                s0 = s0 + "\t%d"%self._restraints[i*self._size + j]
-              else:
-                s0 = s0 + "\t."
-              s1 = s1 + "\t%d"%current_node.getState()[i*self._size+j]
-              if (j+1)%self._offset[1] == 0:
-                s1 = s1 + "\t"
-                s0 = s0 + "\t"
-            s1 = s1 + "\n"
-            s0 = s0 + "\n"
-            if (i+1)%self._offset[0] == 0:
-              s1 = s1 + "\n"
-              s0 = s0 + "\n"
-
-          print(s0)
-          print("Solution is:")
-          print(s1)
-          print("Total Runtime: %f"%(current_time-start_time) + "s")
-          print("Amount of Generated Nodes: %d"%amount_generated_nodes)
-          print("Amount of Discarded Nodes: %d"%discard_generated_nodes)
-          print("")
+          self.showSolution(current_node.getState(), current_time-start_time, amount_generated_nodes, discard_generated_nodes)
         if test == False:
           return current_node.getState()
         else:
           return [current_node.getState(), current_time-start_time, amount_generated_nodes, discard_generated_nodes]
 
+    current_time = time.perf_counter()
     #show progress rate
     if self._show_progress_rate > 0:
+      self.showSolution([], current_time-start_time, amount_generated_nodes, discard_generated_nodes)
+    return [[], current_time-start_time, amount_generated_nodes, discard_generated_nodes]
+
+  def createFrontier(self, strategy, heuristic = 'blanks', beam_width = 100):
+    """ Return an empty frontier for the given strategy:
+      'bfs': breadth-first, the node generated earliest is taken first;
+      'dfs': depth-first, the node generated latest is taken first;
+      'best': best-first, the node having the smallest heuristic value is taken first;
+      'beam': breadth-first, but only the beam_width nodes having the smallest heuristic values in every depth are kept,
+              so that a solution may be missed.
+    The parameter heuristic is 'blanks', the amount of blank squares, or 'domains', the total amount of possible numbers of the blank squares.
+    If a memory budget is set by SudokuSolver.setMemoryBudget(), the 'bfs' frontier spills the nodes over the budget to disk."""
+    if strategy == 'bfs':
+      if self._memory_budget is not None:
+        if self._compact_nodes:
+          raise TypeError("Compact nodes cannot be spilled to disk.")
+        return SpillingFrontier(self._memory_budget, self._spill_directory)
+      return BreadthFirstFrontier()
+    elif strategy == 'dfs':
+      return DepthFirstFrontier()
+    elif strategy == 'best':
+      return BestFirstFrontier(heuristic)
+    elif strategy == 'beam':
+      return BeamFrontier(heuristic, beam_width)
+    raise TypeError("A illegal search strategy " + strategy + " is given.")
+
+  def solveDancingLinks(self, test = False):
+    """ Solve a Sudoku game as an exact cover problem using Knuth's Algorithm X with Dancing Links.
+    Every row of the matrix means putting a number into a square,
+    and every col of the matrix means a square, or a number in a row, a col or a subset, which must be covered exactly once.
+    The generated nodes are the rows tried by Algorithm X, and the discarded nodes are the dead ends where a col cannot be covered.
+    Return the same as SudokuSolver.solve()."""
+    start_time = time.perf_counter()
+    matrix = self.createExactCover()
+    state = []
+    for solution in matrix.search():
+      state = [0] * (self._size * self._size)
+      for pos, number in solution:
+        state[pos] = number
+      break
+    current_time = time.perf_counter()
+    if self._show_progress_rate > 0:
+      self.showSolution(state, current_time-start_time, matrix.generated, matrix.discarded)
+    if test == False and state:
+      return state
+    return [state, current_time-start_time, matrix.generated, matrix.discarded]
+
+  def createExactCover(self):
+    """ Return the DancingLinks matrix of the game, in which every row, (position, number), means putting number into the square at position."""
+    size = self._size
+    squares = size * size
+    matrix = DancingLinks(4 * squares)
+    geometry = self._geometry
+    rows, cols, boxes = [0] * size, [0] * size, [0] * size
+    for pos in self._restraints:
+      bit = 1 << (self._restraints[pos] - 1)
+      rows[geometry.row_of[pos]] |= bit
+      cols[geometry.col_of[pos]] |= bit
+      boxes[geometry.box_of[pos]] |= bit
+    for pos in range(squares):
+      x, y, b = geometry.row_of[pos], geometry.col_of[pos], geometry.box_of[pos]
+      if pos in self._restraints:
+        numbers = [self._restraints[pos]]
+      else:
+        numbers = Node.maskToValues(((1 << size) - 1) & ~(rows[x] | cols[y] | boxes[b]))
+      for number in numbers:
+        k = number - 1
+        matrix.addRow((pos, number), [pos, squares + x * size + k, 2 * squares + y * size + k, 3 * squares + b * size + k])
+    return matrix
+
+  def generateSolutions(self, method = 4, strategy = 'dfs'):
+    """ Yield the state of every solution of the game as soon as it is found.
+    If method == 4, the solutions are enumerated by Dancing Links,
+    otherwise by the search of SudokuSolver.solveBFS() with the given strategy, which goes on after a solution is found.
+    The strategy 'beam' cannot be used, because it may miss solutions."""
+    if method == 4:
+      for solution in self.createExactCover().search():
+        state = [0] * (self._size * self._size)
+        for pos, number in solution:
+          state[pos] = number
+        yield state
+      return
+    if strategy == 'beam':
+      raise TypeError("The beam search cannot enumerate all the solutions.")
+    self._propagation_stats = dict((rule, [0, 0.0]) for rule in self._propagation_rules)
+    frontier = self.createFrontier(strategy)
+    initial_node = self.generateInitialNode(method)
+    if initial_node is not None:
+      frontier.push(initial_node)
+    while frontier:
+      current_node = frontier.pop()
+      if current_node.isComplete():
+        yield current_node.getState()
+        continue
+      for ch in current_node.childNodes(self._forward_checking):
+        if self.isLegal(ch) and (not self._propagation_rules or ch.propagate(self._propagation_rules, self._propagation_stats)):
+          frontier.push(ch)
+
+  def iterSolutions(self):
+    """ Yield the state of every solution of the game lazily, as soon as it is found by depth-first backtracking.
+    Only one state, the bitmasks of the numbers used in every row, col and subset, and a stack of (position, numbers not tried yet) are kept,
+    in which the square having the fewest possible numbers is chosen at every depth,
+    so the memory is proportional to the depth rather than to the width of a BFS level.
+    Nothing is searched until the next solution is requested, so the search stops as soon as the caller stops iterating."""
+    geometry = self._geometry
+    row_of, col_of, box_of = geometry.row_of, geometry.col_of, geometry.box_of
+    full = (1 << self._size) - 1
+    state = [0] * (self._size * self._size)
+    rows, cols, boxes = [0] * self._size, [0] * self._size, [0] * self._size
+    for pos in self._restraints:
+      bit = 1 << (self._restraints[pos] - 1)
+      if (rows[row_of[pos]] | cols[col_of[pos]] | boxes[box_of[pos]]) & bit:
+        return
+      state[pos] = self._restraints[pos]
+      rows[row_of[pos]] |= bit
+      cols[col_of[pos]] |= bit
+      boxes[box_of[pos]] |= bit
+    blanks = set(pos for pos in range(len(state)) if state[pos] == 0)
+    # The amount of possible numbers of every bitmask, if the table is small enough
+    counts = [bin(mask).count('1') for mask in range(full + 1)] if self._size <= 16 else None
+    stack = []
+    descend = True
+    while True:
+      if descend:
+        if not blanks:
+          yield list(state)
+        else:
+          fewest = self._size + 1
+          for pos in blanks:
+            mask = full & ~(rows[row_of[pos]] | cols[col_of[pos]] | boxes[box_of[pos]])
+            count = counts[mask] if counts else bin(mask).count('1')
+            if count < fewest:
+              fewest, position, possible = count, pos, mask
+              if count == 0:
+                break
+          blanks.remove(position)
+          stack.append([position, possible])
+      if not stack:
+        return
+      # Take back the number put into the square on the top of the stack, and put the next possible number if any.
+      entry = stack[-1]
+      pos = entry[0]
+      x, y, b = row_of[pos], col_of[pos], box_of[pos]
+      if state[pos]:
+        bit = ~(1 << (state[pos] - 1))
+        rows[x] &= bit
+        cols[y] &= bit
+        boxes[b] &= bit
+        state[pos] = 0
+      if entry[1] == 0:
+        stack.pop()
+        blanks.add(pos)
+        descend = False
+        continue
+      bit = entry[1] & -entry[1]
+      entry[1] ^= bit
+      state[pos] = bit.bit_length()
+      rows[x] |= bit
+      cols[y] |= bit
+      boxes[b] |= bit
+      descend = True
+
+  def countSolutions(self, limit = None, method = 4, strategy = 'dfs'):
+    """ Return the amount of solutions of the game, counting at most limit solutions if limit is given,
+    so that countSolutions(2) == 1 checks if the solution is unique as soon as a second solution is found.
+    The solutions are enumerated by SudokuSolver.generateSolutions() with the given method and strategy."""
+    count = 0
+    for state in self.generateSolutions(method, strategy):
+      count = count + 1
+      if count == limit:
+        break
+    return count
+
+  def solveVectorized(self, method = 2, test = False):
+    """ Solve a Sudoku game using level-synchronous BFS, in which all the nodes of a depth are held in a 2-D uint8 NumPy array, one row for every node's state.
+    Since the order of squares is static if method != 3, all the nodes of a depth put a number into the same square,
+    so that the child nodes of a whole depth are generated and examined by the rule of Sudoku at once by the array operations.
+    The nodes are generated and discarded the same as SudokuSolver.solve() with the strategy 'bfs',
+    except that the forward checking is not used and the propagation is only applied to the initial node.
+    numpy is needed only by this method.
+    Return the same as SudokuSolver.solve()."""
+    try:
+      import numpy
+    except ImportError:
+      raise ImportError("The vectorized BFS needs numpy, which is not installed.")
+    if method == 3:
+      raise TypeError("The vectorized BFS needs a static order of squares, but method 3 is given.")
+    start_time = time.perf_counter()
+    self._propagation_stats = dict((rule, [0, 0.0]) for rule in self._propagation_rules)
+    squares = self._size * self._size
+    peers = self._geometry.peers
+    # bits[v] is the bit of the number v, and the bit 0 is for a blank square.
+    bits = numpy.array([1 << v for v in range(self._size + 1)], numpy.int64)
+
+    amount_generated_nodes = 1
+    discard_generated_nodes = 0
+    node = Node([self._size, self._offset[0], self._offset[1], self._restraints, method])
+    if node.hasConflict() or (self._propagation_rules and not node.propagate(self._propagation_rules, self._propagation_stats)):
+      level = numpy.zeros((0, squares), numpy.uint8)
+    else:
+      level = numpy.frombuffer(node.getStateView(), numpy.uint8).reshape(1, squares).copy()
+
+    for position, mask in node.getActionOrder():
+      if len(level) == 0:
+        break
+      if self._show_progress_rate > 1:
+        print("Putting number into the %d"%position + "th square with %d"%len(level) + " nodes in the depth.")
+        print("%d"%amount_generated_nodes + " nodes have been generated. %d"%discard_generated_nodes + " nodes have been discard.")
+        print("RunTime: %f"%(time.perf_counter() - start_time))
+      used = numpy.zeros(len(level), numpy.int64)
+      for peer in peers[position]:
+        used |= bits[level[:, peer]]
+      numbers = numpy.array(Node.maskToValues(mask), numpy.uint8)
+      # legal[i, j] is True if numbers[j] is not used in the row, col and subset of the square in the i-th node's state.
+      legal = (used[:, None] & bits[numbers][None, :]) == 0
+      parents, choices = numpy.nonzero(legal)
+      amount_generated_nodes = amount_generated_nodes + legal.size
+      discard_generated_nodes = discard_generated_nodes + legal.size - len(parents)
+      level = level[parents]
+      level[:, position] = numbers[choices]
+
+    state = level[0].tolist() if len(level) > 0 else []
+    current_time = time.perf_counter()
+    if self._show_progress_rate > 0:
+      self.showSolution(state, current_time-start_time, amount_generated_nodes, discard_generated_nodes)
+    if test == False and state:
+      return state
+    return [state, current_time-start_time, amount_generated_nodes, discard_generated_nodes]
+
+  def showSolution(self, state, runtime, amount_generated_nodes, discard_generated_nodes):
+    """ Print the Sudoku game, the solution state and the statistics of the search, or "No Solution!" if state is empty."""
+    if not state:
       print("No Solution!")
       print("Amount of Generated Nodes: %d"%amount_generated_nodes)
       print("Amount of Discarded Nodes: %d"%discard_generated_nodes)
       print("")
-    return [[], current_time-start_time, amount_generated_nodes, discard_generated_nodes]
+      return
+    print("Solution was found!")
+    s1 = ''
+    s0 = ''
+    for i in range(self._size):
+      for j in range(self._size):
+        if i*self._size + j in self._restraints.keys():
+          s0 = s0 + "\t%d"%self._restraints[i*self._size + j]
+        else:
+          s0 = s0 + "\t."
+        s1 = s1 + "\t%d"%state[i*self._size+j]
+        if (j+1)%self._offset[1] == 0:
+          s1 = s1 + "\t"
+          s0 = s0 + "\t"
+      s1 = s1 + "\n"
+      s0 = s0 + "\n"
+      if (i+1)%self._offset[0] == 0:
+        s1 = s1 + "\n"
+        s0 = s0 + "\n"
+
+    print(s0)
+    print("Solution is:")
+    print(s1)
+    print("Total Runtime: %f"%runtime + "s")
+    print("Amount of Generated Nodes: %d"%amount_generated_nodes)
+    print("Amount of Discarded Nodes: %d"%discard_generated_nodes)
+    print("")
   
   def showProgressRate(self, show):
     self._show_progress_rate = show
+
+  def setPropagation(self, level):
+    """ Enable the propagation rules of the given level and disable the others.
+    If level > 0, numbers deduced by the enabled rules are put into every generated node, including the initial node,
+    and a node whose state contradicts with the rule of Sudoku is discarded.
+      0: no propagation;
+      1: naked singles and hidden singles;
+      2: and naked pairs, hidden pairs, pointing pairs and box/line reduction;
+      3: and naked triples, hidden triples and X-wing."""
+    self._propagation_rules = []
+    for rule in Node.PROPAGATION_RULES:
+      if Node.PROPAGATION_RULES[rule] <= level:
+        self._propagation_rules.append(rule)
+    self._propagation_stats = {}
+
+  def setPropagationRule(self, rule, enabled = True):
+    """ Enable or disable a single propagation rule, whose name is a key of Node.PROPAGATION_RULES, e.g. setPropagationRule('x_wing')."""
+    if rule not in Node.PROPAGATION_RULES:
+      raise TypeError("A illegal propagation rule " + rule + " is given.")
+    if enabled and rule not in self._propagation_rules:
+      self._propagation_rules = [r for r in Node.PROPAGATION_RULES if r in self._propagation_rules or r == rule]
+    elif not enabled and rule in self._propagation_rules:
+      self._propagation_rules.remove(rule)
+
+  def getPropagationStats(self):
+    """ Return a dictionary { rule: [amount of eliminations, time used], ... } of the enabled propagation rules during the last call of solve().
+    For naked singles and hidden singles, the amount is the amount of numbers put into squares."""
+    return self._propagation_stats
+
+  def setCompactNodes(self, compact):
+    """ If compact is True, the search tree is built of CompactNode rather than Node,
+    which only stores its parent, the square and the number put, so that much less memory is used for a large frontier.
+    Compact nodes cannot be used together with the propagation."""
+    self._compact_nodes = compact
+
+  def setMemoryBudget(self, budget, directory = None):
+    """ If budget is not None, the frontier of BFS keeps at most about budget nodes in memory,
+    and the other nodes are spilled into temporary files in directory (the system's temporary folder by default), see SpillingFrontier.
+    It cannot be used together with compact nodes."""
+    self._memory_budget = budget
+    self._spill_directory = directory
+
+  def setSolutionCache(self, cache):
+    """ Set a SolutionCache, which can be shared by many solvers, to be used by SudokuSolver.solve(), or None to use no cache."""
+    self._solution_cache = cache
+
+  def setSolutionStore(self, store):
+    """ Set a SolutionStore to be used by SudokuSolver.solve(), or None to use no store."""
+    self._solution_store = store
+
+  def setForwardChecking(self, forward_checking):
+    """ If forward_checking is True, only the legal child nodes which do not make any remaining blank square have no possible number will be generated."""
+    self._forward_checking = forward_checking
   
+class Geometry:
+  """ The tables of a Sudoku game whose subsets have offset[0] rows and offset[1] cols.
+  They are computed only once for every (size, offset) and shared by all SudokuSolver and Node instances, see Geometry.get().
+    size: the amount of squares in a row, a col or a subset;
+    row_of, col_of, box_of: the row, the col and the subset of every square;
+    units: the positions of the squares in every row (0 to size-1), col (size to 2*size-1) and subset (2*size to 3*size-1);
+    peers: the positions of the other squares in the row, the col and the subset of every square."""
+
+  _cache = {}
+
+  @classmethod
+  def get(cls, offset):
+    """ Return the cached geometry of the given offset, computing it if this is the first call for the offset."""
+    key = (offset[0], offset[1])
+    geometry = cls._cache.get(key)
+    if geometry is None:
+      geometry = cls(key)
+      cls._cache[key] = geometry
+    return geometry
+
+  def __init__(self, offset):
+    self.offset = offset
+    self.size = offset[0] * offset[1]
+    size = self.size
+    self.row_of = [pos // size for pos in range(size * size)]
+    self.col_of = [pos % size for pos in range(size * size)]
+    self.box_of = [(self.row_of[pos] // offset[0]) * offset[0] + self.col_of[pos] // offset[1] for pos in range(size * size)]
+    self.units = []
+    for x in range(size):
+      self.units.append([x * size + y for y in range(size)])
+    for y in range(size):
+      self.units.append([x * size + y for x in range(size)])
+    for b in range(size):
+      start = (b - b % offset[0]) * size + (b % offset[0]) * offset[1]
+      self.units.append([start + i * size + j for i in range(offset[0]) for j in range(offset[1])])
+    self.peers = []
+    for pos in range(size * size):
+      peers = set(self.units[self.row_of[pos]] + self.units[size + self.col_of[pos]] + self.units[2 * size + self.box_of[pos]])
+      peers.discard(pos)
+      self.peers.append(sorted(peers))
+
+
+class BreadthFirstFrontier:
+  """ A FIFO frontier for breadth-first search."""
+
+  def __init__(self):
+    self._nodes = deque()
+
+  def __len__(self):
+    return len(self._nodes)
+
+  def push(self, node):
+    self._nodes.append(node)
+
+  def pop(self):
+    return self._nodes.popleft()
+
+
+class SpillingFrontier:
+  """ A FIFO frontier for breadth-first search which keeps at most about budget nodes in memory.
+  The nodes are popped from self._nodes; once it is full, the nodes pushed are collected in self._tail,
+  which is appended to one temporary file as a segment whenever it has budget/2 nodes.
+  self._segments records (offset, amount of nodes) of every segment in the file, which are read back in FIFO order when self._nodes is empty,
+  and the file is truncated whenever all segments are read, so that BFS becomes slower rather than running out of memory.
+  Only one file is opened however many segments are spilled."""
+
+  def __init__(self, budget, directory = None):
+    self._nodes = deque()
+    self._tail = []
+    self._segments = deque()
+    self._segment_size = max(1, budget // 2)
+    self._directory = directory
+    self._file = None
+    self._end = 0
+    self._length = 0
+    # The amount of segments written into the temporary file
+    self.spilled = 0
+
+  def __len__(self):
+    return self._length
+
+  def push(self, node):
+    self._length = self._length + 1
+    if not self._tail and not self._segments and len(self._nodes) < self._segment_size:
+      self._nodes.append(node)
+      return
+    self._tail.append(node)
+    if len(self._tail) >= self._segment_size:
+      if self._file is None:
+        self._file = tempfile.TemporaryFile(dir = self._directory)
+      self._file.seek(self._end)
+      pickle.dump(self._tail, self._file, pickle.HIGHEST_PROTOCOL)
+      self._segments.append((self._end, len(self._tail)))
+      self._end = self._file.tell()
+      self._tail = []
+      self.spilled = self.spilled + 1
+
+  def pop(self):
+    if not self._nodes:
+      if self._segments:
+        offset, amount = self._segments.popleft()
+        self._file.seek(offset)
+        self._nodes = deque(pickle.load(self._file))
+        if not self._segments:
+          # All segments are read, so the file is used again from the beginning.
+          self._file.seek(0)
+          self._file.truncate()
+          self._end = 0
+      else:
+        self._nodes = deque(self._tail)
+        self._tail = []
+    self._length = self._length - 1
+    return self._nodes.popleft()
+
+
+class DepthFirstFrontier:
+  """ A LIFO frontier for depth-first search."""
+
+  def __init__(self):
+    self._nodes = []
+
+  def __len__(self):
+    return len(self._nodes)
+
+  def push(self, node):
+    self._nodes.append(node)
+
+  def pop(self):
+    return self._nodes.pop()
+
+
+class BestFirstFrontier:
+  """ A priority frontier for best-first search, in which the node having the smallest heuristic value is taken first.
+  Nodes having the same value are taken in the order they are pushed."""
+
+  def __init__(self, heuristic = 'blanks'):
+    self._nodes = []
+    self._heuristic = heuristic
+    self._count = 0
+
+  def __len__(self):
+    return len(self._nodes)
+
+  def push(self, node):
+    heapq.heappush(self._nodes, (node.getHeuristic(self._heuristic), self._count, node))
+    self._count = self._count + 1
+
+  def pop(self):
+    return heapq.heappop(self._nodes)[2]
+
+
+class BeamFrontier:
+  """ A frontier for beam search, which works as a FIFO frontier,
+  but only the width nodes having the smallest heuristic values in every depth are kept."""
+
+  def __init__(self, heuristic = 'blanks', width = 100):
+    self._current = deque()
+    self._next = []
+    self._heuristic = heuristic
+    self._width = width
+    self._count = 0
+
+  def __len__(self):
+    return len(self._current) + len(self._next)
+
+  def push(self, node):
+    self._next.append((node.getHeuristic(self._heuristic), self._count, node))
+    self._count = self._count + 1
+
+  def pop(self):
+    if not self._current:
+      self._current = deque(entry[2] for entry in heapq.nsmallest(self._width, self._next))
+      self._next = []
+    return self._current.popleft()
+
+
+class CompactNode:
+  """ A compact node in a search tree, which only stores its parent, the square and the number put, and its depth.
+  Its state is not stored but materialized into a scratch Node, the initial node, shared by all compact nodes of the search tree.
+  The scratch node records the path of compact nodes it represents, and moving it to another compact node
+  only removes and puts the numbers that differ between the two paths."""
+
+  __slots__ = ('_parent', '_position', '_number', '_depth', '_scratch')
+
+  def __init__(self, parent_node, position = None, number = None):
+    """ Generate the root compact node if parent_node is the initial Node, which is used as the scratch node.
+    Otherwise, generate the compact node putting number into the square at position of parent_node's state."""
+    if isinstance(parent_node, Node):
+      self._parent = None
+      self._position = None
+      self._number = None
+      self._depth = parent_node.getDepth()
+      self._scratch = parent_node
+      parent_node._path = [self]
+    else:
+      self._parent = parent_node
+      self._position = position
+      self._number = number
+      self._depth = parent_node._depth + 1
+      self._scratch = parent_node._scratch
+
+  def materialize(self):
+    """ Make the scratch node represent the current node's state, and return the scratch node."""
+    scratch = self._scratch
+    path = scratch._path
+    if path[-1] is self:
+      return scratch
+    # Find the nearest ancestor which is in the path of the scratch node
+    chain = []
+    node = self
+    while node._depth - path[0]._depth >= len(path) or path[node._depth - path[0]._depth] is not node:
+      chain.append(node)
+      node = node._parent
+    while path[-1] is not node:
+      scratch.removeNumber(path[-1]._position)
+      path.pop()
+    for node in reversed(chain):
+      scratch.putNumber(node._position, node._number)
+      path.append(node)
+    scratch._depth = self._depth
+    scratch._index = self._depth
+    scratch._position = self._position
+    scratch._next = None
+    return scratch
+
+  def getState(self):
+    """ Return a copy of the state of the current node as a list"""
+    return self.materialize().getState()
+
+  def getStateView(self):
+    """ Return a read-only view of the state of the current node without copying it.
+    The view is the scratch node's state, which changes when another compact node is materialized."""
+    return self.materialize().getStateView()
+
+  def getSquare(self, position):
+    """ Return the number at the square at position in the state of the current node, or 0 if the square is blank"""
+    return self.materialize().getSquare(position)
+
+  def getDepth(self):
+    """ Return the depth of current path"""
+    return self._depth
+
+  def getPosition(self):
+    """ Return the position of the square which is given a number in the current node"""
+    return self._position
+
+  def getNumber(self):
+    """ Return the number put into the square in the current node"""
+    return self._number
+
+  def getParentTables(self):
+    """ Return the parent's tables of the used numbers. They are the scratch node's tables, which change when another node is materialized."""
+    return self._parent.materialize().getTables()
+
+  def boxIndex(self, row, col):
+    """ Return the index of the subset which the square at the given row and col belongs to."""
+    return self._scratch.boxIndex(row, col)
+
+  def isComplete(self):
+    """ Return True if all squares in the current node's state have a number."""
+    return self._depth + 1 >= len(self._scratch._action_lists)
+
+  def getHeuristic(self, heuristic):
+    """ Return the same as Node.getHeuristic()"""
+    if heuristic == 'blanks':
+      return len(self._scratch._action_lists) - self._depth - 1
+    return self.materialize().getHeuristic(heuristic)
+
+  def childNodes(self, forward_checking = False):
+    """ Return the same as Node.childNodes(), but the child nodes are compact nodes."""
+    scratch = self.materialize()
+    if self.isComplete():
+      return []
+    position, mask = scratch.getNextSquare()
+    if forward_checking:
+      mask = scratch.forwardCheck(position, mask)
+    child_nodes = []
+    num = 1
+    while mask:
+      if mask & 1:
+        child_nodes.append(CompactNode(self, position, num))
+      mask >>= 1
+      num = num + 1
+    return child_nodes
+
+
+class DancingLinks:
+  """ Knuth's Algorithm X with Dancing Links for an exact cover problem.
+  The matrix is stored in the lists of links self._left, self._right, self._up and self._down,
+  in which the index 0 is the root, the indices 1 to n are the headers of the n cols, and the others are the 1s of the matrix.
+  self._col records the header of every 1, and self._count records the amount of 1s in every col."""
+
+  def __init__(self, columns):
+    """ The parameter columns is the amount of cols of the matrix."""
+    self._left = [columns] + list(range(columns))
+    self._right = list(range(1, columns + 1)) + [0]
+    self._up = list(range(columns + 1))
+    self._down = list(range(columns + 1))
+    self._col = list(range(columns + 1))
+    self._count = [0] * (columns + 1)
+    self._row = [None] * (columns + 1)
+    self.generated = 0
+    self.discarded = 0
+
+  def addRow(self, row, columns):
+    """ Add a row, whose 1s are at the given cols (counting from 0), to the matrix.
+    The parameter row is the value which will be returned in the solutions for the row."""
+    first = len(self._col)
+    for i in range(len(columns)):
+      c = columns[i] + 1
+      node = first + i
+      self._left.append(node - 1 if i > 0 else first + len(columns) - 1)
+      self._right.append(node + 1 if i < len(columns) - 1 else first)
+      self._up.append(self._up[c])
+      self._down.append(c)
+      self._down[self._up[c]] = node
+      self._up[c] = node
+      self._col.append(c)
+      self._row.append(row)
+      self._count[c] += 1
+
+  def cover(self, c):
+    """ Remove the col c and all rows having a 1 in the col c from the matrix."""
+    left, right, up, down, col, count = self._left, self._right, self._up, self._down, self._col, self._count
+    right[left[c]] = right[c]
+    left[right[c]] = left[c]
+    i = down[c]
+    while i != c:
+      j = right[i]
+      while j != i:
+        down[up[j]] = down[j]
+        up[down[j]] = up[j]
+        count[col[j]] -= 1
+        j = right[j]
+      i = down[i]
+
+  def uncover(self, c):
+    """ Put the col c and all rows having a 1 in the col c back into the matrix, in the reverse order of cover()."""
+    left, right, up, down, col, count = self._left, self._right, self._up, self._down, self._col, self._count
+    i = up[c]
+    while i != c:
+      j = left[i]
+      while j != i:
+        count[col[j]] += 1
+        down[up[j]] = j
+        up[down[j]] = j
+        j = left[j]
+      i = up[i]
+    right[left[c]] = c
+    left[right[c]] = c
+
+  def search(self):
+    """ Yield the solutions one by one as lists of the rows' values.
+    The col having the fewest 1s is always covered first.
+    The search uses a stack of [covered col, row being tried] rather than recursion, so its depth is not limited by the amount of squares."""
+    left, right, down, col, count = self._left, self._right, self._down, self._col, self._count
+    solution = []
+    stack = []
+    descend = True
+    while True:
+      if descend:
+        if right[0] == 0:
+          yield list(solution)
+        else:
+          c = right[0]
+          best = c
+          while c != 0:
+            if count[c] < count[best]:
+              best = c
+              if count[c] == 0:
+                break
+            c = right[c]
+          c = best
+          if count[c] == 0:
+            self.discarded += 1
+          else:
+            self.cover(c)
+            # No row of the col c has been tried yet.
+            stack.append([c, c])
+      if not stack:
+        return
+      # Take back the row tried at the top of the stack, and try the next row of its col if any.
+      entry = stack[-1]
+      c, r = entry
+      if r != c:
+        j = left[r]
+        while j != r:
+          self.uncover(col[j])
+          j = left[j]
+        solution.pop()
+      r = down[r]
+      if r == c:
+        self.uncover(c)
+        stack.pop()
+        descend = False
+        continue
+      entry[1] = r
+      self.generated += 1
+      solution.append(self._row[r])
+      j = right[r]
+      while j != r:
+        self.cover(col[j])
+        j = right[j]
+      descend = True
+
+
 class Node:
   """ A node in a search tree.
-  A one-dimensional list is used to represent a node's state.
+  A one-dimensional bytearray is used to represent a node's state.
   e.g. For a Sudoku game having n x n squares, the node
       [ N11, N12, N13, ..., N1n,
         N21,      ...,      N2n,
@@ -397,7 +1234,19 @@ class Node:
       represents a state in which
         Nij is the number at the square
         locating at the joint of the i row and j col."""
-        
+
+  # The propagation rules used by Node.propagate(), and the least propagation level enabling every rule in SudokuSolver.setPropagation()
+  PROPAGATION_RULES = {
+    'naked_singles': 1,
+    'hidden_singles': 1,
+    'naked_pairs': 2,
+    'hidden_pairs': 2,
+    'pointing': 2,
+    'box_line': 2,
+    'naked_triples': 3,
+    'hidden_triples': 3,
+    'x_wing': 3,
+  }
 
   def __init__(self, number, parent_node = None):
     """ Generate the initial node if no parent_node is given.
@@ -406,26 +1255,61 @@ class Node:
     
     if parent_node == None:
       self._depth = -1
-      self._state = []
       self._size = number[0]
       self._offset = [number[1], number[2]]
-      for i in range(self._size*self._size):
-        self._state.append(0)
+      self._geometry = Geometry.get(self._offset)
+      self._state = bytearray(self._size*self._size)
       self._action_lists = {}
+      self._position = None
+      self._parent_tables = None
+      self._method = number[4]
+      self._next = None
+      self._index = -1
       self.assignInitialState(number[3], number[4])
+      self._blanks = len(self._action_lists)
+      self._domains = [0] * (self._size * self._size)
+      for pos, domain in self._action_lists:
+        self._domains[pos] = domain
     else:
       self._depth = parent_node.getDepth() + 1
-      self._state = parent_node.getState()
+      self._state = bytearray(parent_node._state)
       self._state[number[1]] = number[0]
+      self._position = number[1]
       self._size = parent_node._size
+      self._offset = parent_node._offset
       self._action_lists = parent_node._action_lists
+      self._method = parent_node._method
+      self._next = None
+      self._index = parent_node._next_index
+      self._blanks = parent_node._blanks - 1
+      self._geometry = parent_node._geometry
+      self._domains = parent_node._domains
+      # The tables of the used numbers are derived from the parent's tables only when this node is expanded,
+      # so that a child node which is discarded by SudokuSolver.isLegal() never copies them.
+      self._parent_tables = parent_node.getTables()
+      self._tables = None
+
+  def __getstate__(self):
+    """ Leave the shared geometry out when a node is pickled, e.g. spilled to disk by SpillingFrontier."""
+    state = self.__dict__.copy()
+    del state['_geometry']
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self._geometry = Geometry.get(self._offset)
   
   def getState(self):
-    """ Return the state of the current node"""
-    copy = []
-    for i in range(len(self._state)):
-      copy.append(self._state[i])
-    return copy
+    """ Return a copy of the state of the current node as a list"""
+    return list(self._state)
+
+  def getStateView(self):
+    """ Return a read-only view of the state of the current node without copying it"""
+    return memoryview(self._state).toreadonly()
+
+  def getSquare(self, position):
+    """ Return the number at the square at position in the state of the current node, or 0 if the square is blank"""
+    return self._state[position]
   
   def getDepth(self):
     """ Return the depth of current path"""
@@ -433,79 +1317,484 @@ class Node:
     
   def getPosition(self):
     """ Return the position of the square which is given a number in the current node"""
-    return self._action_lists[self.getDepth()][0]
+    if self._position is None:
+      return self._action_lists[self.getDepth()][0]
+    return self._position
+
+  def getTables(self):
+    """ Return the tuple (rows, cols, boxes) of bitmasks recording the numbers used in every row, col and subset in the current node's state.
+    The tables of a child node are derived from its parent's tables by setting a single bit."""
+    if self._tables is None:
+      rows, cols, boxes = self._parent_tables
+      geometry = self._geometry
+      bit = 1 << (self._state[self._position] - 1)
+      rows = list(rows)
+      cols = list(cols)
+      boxes = list(boxes)
+      rows[geometry.row_of[self._position]] |= bit
+      cols[geometry.col_of[self._position]] |= bit
+      boxes[geometry.box_of[self._position]] |= bit
+      self._tables = (rows, cols, boxes)
+      self._parent_tables = None
+    return self._tables
+
+  def getNumber(self):
+    """ Return the number put into the square in the current node"""
+    return self._state[self._position]
+
+  def getParentTables(self):
+    """ Return the parent's tables of the used numbers, or None if the current node is the initial node or has been expanded."""
+    return self._parent_tables
+
+  def getHeuristic(self, heuristic):
+    """ Return the amount of blank squares if heuristic == 'blanks',
+    or the total amount of possible numbers of the blank squares if heuristic == 'domains', in the current node's state."""
+    if heuristic == 'blanks':
+      return self._blanks
+    elif heuristic == 'domains':
+      rows, cols, boxes = self.getTables()
+      row_of, col_of, box_of = self._geometry.row_of, self._geometry.col_of, self._geometry.box_of
+      total = 0
+      for pos, domain in self._action_lists:
+        if self._state[pos] == 0:
+          total = total + bin(self._domains[pos] & ~(rows[row_of[pos]] | cols[col_of[pos]] | boxes[box_of[pos]])).count('1')
+      return total
+    raise TypeError("A illegal heuristic " + heuristic + " is given.")
+
+  def isComplete(self):
+    """ Return True if all squares in the current node's state have a number."""
+    return self._blanks == 0
   
   def getNextPosition(self):
     """ Return the position of the square which will be given a number in the current node's child nodes."""
-    if len(self._action_lists) < self.getDepth()+1:
+    if self.isComplete():
       return None
-    else:
-      return self._action_lists[self.getDepth()+1][0]
+    return self.getNextSquare()[0]
             
   def getNextPossibleValues(self):
     """ Return the possible values of the square which will be given a number in the current node's child nodes."""
-    if len(self._action_lists) < self.getDepth()+1:
-      return []
-    else:
-      return self._action_lists[self.getDepth()+1][1]
-        
+    return self.maskToValues(self.getNextPossibleMask())
+
+  def getNextPossibleMask(self):
+    """ Return the possible values of the square which will be given a number in the current node's child nodes as a bitmask."""
+    if self.isComplete():
+      return 0
+    return self.getNextSquare()[1]
+
+  def getActionOrder(self):
+    """ Return the list of the tuples (position, possible values as a bitmask) of the blank squares in the current node's state,
+    in the order of squares which will be given a number if method != 3."""
+    return [(pos, self._domains[pos]) for pos, mask in self._action_lists if self._state[pos] == 0]
+
+  def getNextSquare(self):
+    """ Return the tuple (position, possible values as a bitmask) of the square which will be given a number in the current node's child nodes.
+    If method != 3, it is the next blank square in self._action_lists after the current node's square."""
+    if self._next is None:
+      if self._method == 3:
+        self._next_index = None
+        self._next = self.selectNextSquare()
+      else:
+        index = self._index + 1
+        while self._state[self._action_lists[index][0]] != 0:
+          index = index + 1
+        self._next_index = index
+        position = self._action_lists[index][0]
+        self._next = (position, self._domains[position])
+    return self._next
+
+  def selectNextSquare(self):
+    """ Return the tuple (position, possible values as a bitmask) of the blank square which has the fewest possible numbers in the current node's state.
+    Ties are broken by choosing the square having the most blank squares in its row, col and subset."""
+    rows, cols, boxes = self.getTables()
+    row_of, col_of, box_of = self._geometry.row_of, self._geometry.col_of, self._geometry.box_of
+    candidates = []
+    fewest = self._size + 1
+    for pos, domain in self._action_lists:
+      if self._state[pos] == 0:
+        live = self._domains[pos] & ~(rows[row_of[pos]] | cols[col_of[pos]] | boxes[box_of[pos]])
+        count = bin(live).count('1')
+        if count < fewest:
+          fewest = count
+          candidates = [(pos, live)]
+          if count == 0:
+            break
+        elif count == fewest:
+          candidates.append((pos, live))
+    if len(candidates) == 1:
+      return candidates[0]
+    blank_rows = [0] * self._size
+    blank_cols = [0] * self._size
+    blank_boxes = [0] * self._size
+    for pos, domain in self._action_lists:
+      if self._state[pos] == 0:
+        blank_rows[row_of[pos]] += 1
+        blank_cols[col_of[pos]] += 1
+        blank_boxes[box_of[pos]] += 1
+    def degree(candidate):
+      pos = candidate[0]
+      return blank_rows[row_of[pos]] + blank_cols[col_of[pos]] + blank_boxes[box_of[pos]]
+    return max(candidates, key = degree)
+
+  def propagate(self, rules = ('naked_singles', 'hidden_singles'), stats = None):
+    """ Put numbers into the blank squares whose number can be deduced from the current node's state until no more number can be deduced.
+    The parameter rules is a list of the names of the rules in Node.PROPAGATION_RULES that are used.
+    Numbers are put by the singles, and the other rules only remove possible numbers from the squares in self._domains,
+    after which the singles are tried again.
+    If stats { rule: [amount, time], ... } is given, the amount of numbers put or possible numbers removed by every rule and the time used are added to it.
+    Return False if a contradiction is found, namely a blank square having no possible number or a number having no square in a row, a col or a subset."""
+    domains = list(self._domains)
+    self._domains = domains
+    while True:
+      for rule in rules:
+        if stats is not None:
+          start = time.perf_counter()
+        if rule != 'naked_singles' and rule != 'hidden_singles':
+          self.updateDomains(domains)
+        amount = self.applyRule(rule, domains)
+        if stats is not None:
+          record = stats.setdefault(rule, [0, 0.0])
+          record[0] += max(amount, 0)
+          record[1] += time.perf_counter() - start
+        if amount < 0:
+          return False
+        if self._blanks == 0:
+          return True
+        if amount > 0:
+          break
+      else:
+        return True
+
+  def applyRule(self, rule, domains):
+    """ Apply the propagation rule once to the current node's state and the possible numbers domains.
+    Return the amount of numbers put or possible numbers removed, or -1 if a contradiction is found."""
+    if rule == 'naked_singles':
+      return self.putNakedSingles(domains)
+    elif rule == 'hidden_singles':
+      return self.putHiddenSingles(domains)
+    elif rule == 'naked_pairs':
+      return self.removeNakedSubsets(domains, 2)
+    elif rule == 'hidden_pairs':
+      return self.removeHiddenSubsets(domains, 2)
+    elif rule == 'naked_triples':
+      return self.removeNakedSubsets(domains, 3)
+    elif rule == 'hidden_triples':
+      return self.removeHiddenSubsets(domains, 3)
+    elif rule == 'pointing':
+      return self.removePointing(domains)
+    elif rule == 'box_line':
+      return self.removeBoxLine(domains)
+    elif rule == 'x_wing':
+      return self.removeXWing(domains)
+    raise TypeError("A illegal propagation rule " + rule + " is given.")
+
+  def updateDomains(self, domains):
+    """ Remove the numbers used in the row, the col and the subset of every blank square from its possible numbers in domains."""
+    rows, cols, boxes = self.getTables()
+    row_of, col_of, box_of = self._geometry.row_of, self._geometry.col_of, self._geometry.box_of
+    for pos, domain in self._action_lists:
+      if self._state[pos] == 0:
+        domains[pos] &= ~(rows[row_of[pos]] | cols[col_of[pos]] | boxes[box_of[pos]])
+
+  def putNakedSingles(self, domains):
+    """ Put the number into every blank square having only one possible number until there is no such square.
+    The possible numbers of the blank squares in domains are updated according to the numbers used in their row, col and subset."""
+    rows, cols, boxes = self.getTables()
+    row_of, col_of, box_of = self._geometry.row_of, self._geometry.col_of, self._geometry.box_of
+    amount = 0
+    changed = True
+    while changed:
+      changed = False
+      for pos, domain in self._action_lists:
+        if self._state[pos] == 0:
+          live = domains[pos] & ~(rows[row_of[pos]] | cols[col_of[pos]] | boxes[box_of[pos]])
+          domains[pos] = live
+          if live == 0:
+            return -1
+          if live & (live - 1) == 0:
+            self.putNumber(pos, live.bit_length())
+            amount = amount + 1
+            changed = True
+    return amount
+
+  def putHiddenSingles(self, domains):
+    """ Put the number which can be put into only one blank square in a row, a col or a subset into that square."""
+    rows, cols, boxes = self.getTables()
+    row_of, col_of, box_of = self._geometry.row_of, self._geometry.col_of, self._geometry.box_of
+    full = (1 << self._size) - 1
+    amount = 0
+    for unit in self._geometry.units:
+      once = 0
+      twice = 0
+      used = 0
+      for pos in unit:
+        if self._state[pos] == 0:
+          live = domains[pos] & ~(rows[row_of[pos]] | cols[col_of[pos]] | boxes[box_of[pos]])
+          twice |= once & live
+          once |= live
+        else:
+          used |= 1 << (self._state[pos] - 1)
+      if used | once != full:
+        return -1
+      hidden = once & ~twice
+      if hidden:
+        for pos in unit:
+          if self._state[pos] == 0:
+            live = domains[pos] & ~(rows[row_of[pos]] | cols[col_of[pos]] | boxes[box_of[pos]]) & hidden
+            if live:
+              if live & (live - 1):
+                return -1
+              self.putNumber(pos, live.bit_length())
+              amount = amount + 1
+    return amount
+
+  def removeNakedSubsets(self, domains, k):
+    """ If k blank squares in a row, a col or a subset have only k possible numbers in all,
+    remove those numbers from the other blank squares in the row, the col or the subset."""
+    amount = 0
+    for unit in self._geometry.units:
+      blanks = [pos for pos in unit if self._state[pos] == 0]
+      if len(blanks) <= k:
+        continue
+      small = [pos for pos in blanks if bin(domains[pos]).count('1') <= k]
+      for subset in combinations(small, k):
+        union = 0
+        for pos in subset:
+          union |= domains[pos]
+        if bin(union).count('1') == k:
+          for pos in blanks:
+            if pos not in subset and domains[pos] & union:
+              amount = amount + bin(domains[pos] & union).count('1')
+              domains[pos] &= ~union
+    return amount
+
+  def removeHiddenSubsets(self, domains, k):
+    """ If k numbers can be put into only k blank squares in all in a row, a col or a subset,
+    remove the other possible numbers from those blank squares."""
+    amount = 0
+    for unit in self._geometry.units:
+      blanks = [pos for pos in unit if self._state[pos] == 0]
+      if len(blanks) <= k:
+        continue
+      # places[number] is a bitmask of the indices in blanks of the squares which the number can be put into
+      places = {}
+      for i in range(len(blanks)):
+        domain = domains[blanks[i]]
+        number = 1
+        while domain:
+          if domain & 1:
+            places[number] = places.get(number, 0) | (1 << i)
+          domain >>= 1
+          number = number + 1
+      small = [number for number in places if bin(places[number]).count('1') <= k]
+      for subset in combinations(small, k):
+        union = 0
+        numbers = 0
+        for number in subset:
+          union |= places[number]
+          numbers |= 1 << (number - 1)
+        if bin(union).count('1') == k:
+          for i in range(len(blanks)):
+            if union & (1 << i) and domains[blanks[i]] & ~numbers:
+              amount = amount + bin(domains[blanks[i]] & ~numbers).count('1')
+              domains[blanks[i]] &= numbers
+    return amount
+
+  def removePointing(self, domains):
+    """ If a number can be put only into the blank squares in one row or one col within a subset,
+    remove the number from the other blank squares in that row or col."""
+    amount = 0
+    geometry = self._geometry
+    for unit in geometry.units[2*self._size:]:
+      for bit in self.unitCandidates(unit, domains):
+        squares = [pos for pos in unit if self._state[pos] == 0 and domains[pos] & bit]
+        x = geometry.row_of[squares[0]]
+        y = geometry.col_of[squares[0]]
+        if all(geometry.row_of[pos] == x for pos in squares):
+          line = geometry.units[x]
+        elif all(geometry.col_of[pos] == y for pos in squares):
+          line = geometry.units[self._size + y]
+        else:
+          continue
+        for pos in line:
+          if pos not in unit and self._state[pos] == 0 and domains[pos] & bit:
+            domains[pos] &= ~bit
+            amount = amount + 1
+    return amount
+
+  def removeBoxLine(self, domains):
+    """ If a number can be put only into the blank squares in one subset within a row or a col,
+    remove the number from the other blank squares in that subset."""
+    amount = 0
+    geometry = self._geometry
+    for unit in geometry.units[:2*self._size]:
+      for bit in self.unitCandidates(unit, domains):
+        squares = [pos for pos in unit if self._state[pos] == 0 and domains[pos] & bit]
+        b = geometry.box_of[squares[0]]
+        if all(geometry.box_of[pos] == b for pos in squares):
+          for pos in geometry.units[2*self._size + b]:
+            if pos not in unit and self._state[pos] == 0 and domains[pos] & bit:
+              domains[pos] &= ~bit
+              amount = amount + 1
+    return amount
+
+  def removeXWing(self, domains):
+    """ If a number can be put only into the same two cols within two rows,
+    remove the number from the other blank squares in those two cols, and the same for two cols."""
+    amount = 0
+    units = self._geometry.units
+    for lines, crosses in ((units[:self._size], units[self._size:2*self._size]),
+                           (units[self._size:2*self._size], units[:self._size])):
+      for number in range(1, self._size + 1):
+        bit = 1 << (number - 1)
+        # pairs { bitmask of the two indices in the line: [indices of the lines], ... }
+        pairs = {}
+        for l in range(self._size):
+          places = 0
+          count = 0
+          for i in range(self._size):
+            pos = lines[l][i]
+            if self._state[pos] == 0 and domains[pos] & bit:
+              places |= 1 << i
+              count = count + 1
+          if count == 2:
+            pairs.setdefault(places, []).append(l)
+        for places in pairs:
+          if len(pairs[places]) == 2:
+            for i in range(self._size):
+              if places & (1 << i):
+                for pos in crosses[i]:
+                  if self._state[pos] == 0 and domains[pos] & bit and pos not in lines[pairs[places][0]] and pos not in lines[pairs[places][1]]:
+                    domains[pos] &= ~bit
+                    amount = amount + 1
+    return amount
+
+  def unitCandidates(self, unit, domains):
+    """ Return the list of the bits of the numbers which can be put into at least two blank squares in the unit."""
+    once = 0
+    twice = 0
+    for pos in unit:
+      if self._state[pos] == 0:
+        twice |= once & domains[pos]
+        once |= domains[pos]
+    bits = []
+    while twice:
+      bit = twice & -twice
+      bits.append(bit)
+      twice &= ~bit
+    return bits
+
+  def putNumber(self, position, number):
+    """ Put number into the blank square at position of the current node's state."""
+    rows, cols, boxes = self._tables
+    geometry = self._geometry
+    bit = 1 << (number - 1)
+    self._state[position] = number
+    rows[geometry.row_of[position]] |= bit
+    cols[geometry.col_of[position]] |= bit
+    boxes[geometry.box_of[position]] |= bit
+    self._blanks = self._blanks - 1
+
+  def removeNumber(self, position):
+    """ Remove the number from the square at position of the current node's state."""
+    rows, cols, boxes = self._tables
+    geometry = self._geometry
+    bit = ~(1 << (self._state[position] - 1))
+    self._state[position] = 0
+    rows[geometry.row_of[position]] &= bit
+    cols[geometry.col_of[position]] &= bit
+    boxes[geometry.box_of[position]] &= bit
+    self._blanks = self._blanks + 1
+
   def assignInitialState(self, restraints, method = 1):
     """ This is used to generate the initial state and action lists when generating the initial node to set the number given beforehand.
-    The variable self._action_lists is a list which records every square's initial possible values.
+    The variable self._action_lists is a list which records every square's initial possible values as a bitmask.
+    The variable self._tables records the numbers used in every row, col and subset as bitmasks.
+    The variable self._conflict is True if a number is given twice in a row, a col or a subset.
     If method == 1, the program will sort self._action_lists according to the amount of possible numbers in a square, namely use the modification (2) to BFS.
     Else, the program will generate child nodes according to putting numbers into squares from left to right and top to bottom
     """
     for rk in restraints.keys():
       self._state[rk] = restraints[rk]
     
-    size_range = range(self._size)
-    sorted_elements = [i+1 for i in size_range] 
+    row_of, col_of, box_of = self._geometry.row_of, self._geometry.col_of, self._geometry.box_of
+    rows = [0] * self._size
+    cols = [0] * self._size
+    boxes = [0] * self._size
+    self._conflict = False
+    for d in range(self._size * self._size):
+      if self._state[d] != 0:
+        bit = 1 << (self._state[d] - 1)
+        if (rows[row_of[d]] | cols[col_of[d]] | boxes[box_of[d]]) & bit:
+          self._conflict = True
+        rows[row_of[d]] |= bit
+        cols[col_of[d]] |= bit
+        boxes[box_of[d]] |= bit
+    self._tables = (rows, cols, boxes)
 
+    full = (1 << self._size) - 1
     for d in range(self._size * self._size):
-      if self.getState()[d] == 0:
-        values = []
-        x, y = divmod(d + 1, self._size)
-        if y == 0:
-          start = (x-1)*self._size
-          y_m = self._size - 1
-          y = self._size
-        else:
-          start = x * self._size
-          y_m = y-1
-          x = x + 1
-        # get all elements in a row
-        row = self.getState()[start:(start + self._size)]
-        # get all elements in a col
-        col = []
-        for i in size_range:
-          col.append(self.getState()[i * self._size + y_m])
-        # get all elements in a subset
-        i, j = divmod(x, self._offset[0])
-        l, m = divmod(y, self._offset[1])
-        if j == 0:
-          i = i - 1
-        if m == 0:
-          l = l - 1
-        start2 = i * self._offset[0] * self._size + l * self._offset[1]
-        subset = []
-        for i1 in range(self._offset[1]):
-          for j1 in range(self._offset[0]):
-            position2 = start2 + j1 * self._size + i1
-            subset.append(self.getState()[position2])
-        self._action_lists[d] = list(set(sorted_elements).difference(set(row).union(set(col)).union(set(subset))))
+      if self._state[d] == 0:
+        self._action_lists[d] = full & ~(rows[row_of[d]] | cols[col_of[d]] | boxes[box_of[d]])
     if method == 1:
-      self._action_lists = sorted(self._action_lists.items(), key = lambda k: len(k[1]), reverse = False)
+      self._action_lists = sorted(self._action_lists.items(), key = lambda k: bin(k[1]).count('1'), reverse = False)
     else:
       self._action_lists = sorted(self._action_lists.items(), key = lambda k: k[0], reverse = False)
 
-  
-  def childNodes(self):
-    """ Return all the child nodes without the examination of child nodes' legality."""
+  def hasConflict(self):
+    """ Return True if the initial state gives a number twice in a row, a col or a subset, so that the game has no solution."""
+    return self._conflict
+
+  def boxIndex(self, row, col):
+    """ Return the index of the subset which the square at the given row and col belongs to."""
+    return self._geometry.box_of[row * self._size + col]
+
+  @staticmethod
+  def maskToValues(mask):
+    """ Return the numbers whose bits are set in the given bitmask, e.g. 0b100100 -> [3, 6]"""
+    values = []
+    value = 1
+    while mask:
+      if mask & 1:
+        values.append(value)
+      mask >>= 1
+      value = value + 1
+    return values
+
+  def childNodes(self, forward_checking = False):
+    """ Return all the child nodes without the examination of child nodes' legality.
+    If forward_checking is True, return only the child nodes whose number is legal in the current node's state
+    and does not make any remaining blank square have no possible number."""
     child_nodes = []
-    for num in self.getNextPossibleValues():
-      child_nodes.append(Node([num, self.getNextPosition()], self))
+    position = self.getNextPosition()
+    mask = self.getNextPossibleMask()
+    if forward_checking:
+      mask = self.forwardCheck(position, mask)
+    num = 1
+    while mask:
+      if mask & 1:
+        child_nodes.append(Node([num, position], self))
+      mask >>= 1
+      num = num + 1
     return child_nodes
 
+  def forwardCheck(self, position, mask):
+    """ Remove from the bitmask mask the numbers that cannot be put into the square at position in the current node's state,
+    including the numbers that would leave a remaining blank square which shares a row, a col or a subset with that square no possible number."""
+    rows, cols, boxes = self.getTables()
+    row_of, col_of, box_of = self._geometry.row_of, self._geometry.col_of, self._geometry.box_of
+    mask &= ~(rows[row_of[position]] | cols[col_of[position]] | boxes[box_of[position]])
+    # A remaining blank square having only one possible number forbids that number at position,
+    # and one having no possible number at all means no child node can lead to a solution.
+    forbidden = 0
+    for pos in self._geometry.peers[position]:
+      if self._state[pos] == 0:
+        live = self._domains[pos] & ~(rows[row_of[pos]] | cols[col_of[pos]] | boxes[box_of[pos]])
+        if live == 0:
+          return 0
+        if live & (live - 1) == 0:
+          forbidden |= live
+    return mask & ~forbidden
+
 
     
 if __name__ == "__main__":
@@ -635,9 +1924,438 @@ if __name__ == "__main__":
   """
   
 
-def big_data_test(method, difficulty):
-  """ This is a function to test 1465 hard sudoku games with 81 squares.
-  It will record the time used by the solver and the amount of the nodes generated and discarded."""
+def _tie_permutations(items, key):
+  """ Return all the orders of items, which are sorted by key, in which only the items having the same key are permuted."""
+  orders = [[]]
+  for value, group in groupby(items, key):
+    group = list(group)
+    orders = [order + list(p) for order in orders for p in permutations(group)]
+  return orders
+
+def _line_orders(keys, width, limit):
+  """ Return all the orders of the rows (or cols), whose invariants are keys, in which the bands (or stacks) of width lines are sorted by the sorted keys of their lines,
+  and the lines in every band are sorted by their keys. Return None if the ties leave more than limit orders."""
+  bands = []
+  for start in range(0, len(keys), width):
+    lines = sorted(range(start, start + width), key = lambda l: keys[l])
+    bands.append((sorted(keys[l] for l in lines), lines))
+  bands.sort()
+  count = 1
+  for value, group in groupby(bands, lambda band: band[0]):
+    count = count * factorial(len(list(group)))
+  for band in bands:
+    for value, group in groupby(band[1], lambda l: keys[l]):
+      count = count * factorial(len(list(group)))
+  if count > limit:
+    return None
+  orders = []
+  for band_order in _tie_permutations(bands, lambda band: band[0]):
+    for parts in product(*[_tie_permutations(band[1], lambda l: keys[l]) for band in band_order]):
+      orders.append([l for part in parts for l in part])
+  return orders
+
+def canonicalize(restraints, offset, limit = 4096):
+  """ Return (key, transform) for the game given by restraints, {position: number}, whose subsets have offset[0] rows and offset[1] cols.
+  The key is the same for all the games equivalent under relabeling the numbers, permuting the rows in a band (a row of subsets),
+  the cols in a stack (a col of subsets), the bands and the stacks, and transposing if the subsets are square.
+  It is the smallest of the transformed states, whose numbers are relabeled in the order they first appear, and transform maps the game to it, see transform_state().
+  Only the orders of rows and cols sorted by their invariants, namely the amount of given squares in them and in the cols (or rows) of those squares, are searched.
+  If the ties leave more than limit orders, (None, None) is returned instead."""
+  size = offset[0] * offset[1]
+  grid = [0] * (size * size)
+  for pos in restraints:
+    grid[pos] = restraints[pos]
+  best = None
+  for transpose in ((False, True) if offset[0] == offset[1] else (False,)):
+    g = [grid[c * size + r] for r in range(size) for c in range(size)] if transpose else grid
+    row_counts = [sum(1 for c in range(size) if g[r * size + c]) for r in range(size)]
+    col_counts = [sum(1 for r in range(size) if g[r * size + c]) for c in range(size)]
+    row_keys = [(row_counts[r], tuple(sorted(col_counts[c] for c in range(size) if g[r * size + c]))) for r in range(size)]
+    col_keys = [(col_counts[c], tuple(sorted(row_counts[r] for r in range(size) if g[r * size + c]))) for c in range(size)]
+    row_orders = _line_orders(row_keys, offset[0], limit)
+    col_orders = _line_orders(col_keys, offset[1], limit)
+    if row_orders is None or col_orders is None or len(row_orders) * len(col_orders) > limit:
+      return None, None
+    for rows in row_orders:
+      for cols in col_orders:
+        labels = {}
+        values = []
+        for r in rows:
+          base = r * size
+          for c in cols:
+            number = g[base + c]
+            if number:
+              if number not in labels:
+                labels[number] = len(labels) + 1
+              number = labels[number]
+            values.append(number)
+        if best is None or values < best[0]:
+          best = (values, (transpose, rows, cols, labels))
+  values, transform = best
+  labels = transform[3]
+  # The numbers not given in the game can be labeled in any order.
+  for number in range(1, size + 1):
+    if number not in labels:
+      labels[number] = len(labels) + 1
+  return (offset[0], offset[1], bytes(values)), transform
+
+def transform_state(state, transform):
+  """ Return the state transformed by transform, which is returned by canonicalize()."""
+  transpose, rows, cols, labels = transform
+  size = len(rows)
+  if transpose:
+    state = [state[c * size + r] for r in range(size) for c in range(size)]
+  return [labels[state[r * size + c]] if state[r * size + c] else 0 for r in rows for c in cols]
+
+def untransform_state(state, transform):
+  """ Return the state transformed back by the inverse of transform, which is returned by canonicalize()."""
+  transpose, rows, cols, labels = transform
+  size = len(rows)
+  numbers = dict((new, old) for old, new in labels.items())
+  result = [0] * (size * size)
+  for i in range(size):
+    for j in range(size):
+      number = state[i * size + j]
+      result[rows[i] * size + cols[j]] = numbers[number] if number else 0
+  if transpose:
+    result = [result[c * size + r] for r in range(size) for c in range(size)]
+  return result
+
+
+class SolutionCache:
+  """ A LRU cache of the solutions of Sudoku games, which are keyed by the canonical form of the games, see canonicalize(),
+  so that a game equivalent to a solved one is answered by transforming the cached solution back instead of searching again.
+  The solutions are stored transformed into the canonical form, and at most capacity solutions are kept."""
+
+  def __init__(self, capacity = 1024):
+    self._solutions = OrderedDict()
+    self._capacity = capacity
+    self.hits = 0
+    self.misses = 0
+
+  def __len__(self):
+    return len(self._solutions)
+
+  def get(self, key, transform):
+    """ Return the solution of the game whose canonical form is (key, transform), or None if it is not cached."""
+    solution = self._solutions.get(key) if key is not None else None
+    if solution is None:
+      self.misses = self.misses + 1
+      return None
+    self._solutions.move_to_end(key)
+    self.hits = self.hits + 1
+    return untransform_state(solution, transform)
+
+  def put(self, key, transform, state):
+    """ Cache the solution state of the game whose canonical form is (key, transform)."""
+    if key is None:
+      return
+    self._solutions[key] = bytes(transform_state(state, transform))
+    self._solutions.move_to_end(key)
+    if len(self._solutions) > self._capacity:
+      self._solutions.popitem(last = False)
+
+
+class SolutionStore:
+  """ A persistent store of the solutions of Sudoku games in a SQLite database at path, keyed by the size and the puzzle string of the games,
+  in the format of SudokuSolver.getPuzzle(). For every game, the solution, or NULL if it has no solution, is recorded
+  with the time used and the amount of the nodes generated and discarded, as returned by SudokuSolver.solve(test = True),
+  so that the games solved before are not searched again, e.g. when the same corpora are solved every night."""
+
+  # The most puzzles looked up by one query of SolutionStore.getMany()
+  BATCH = 500
+
+  def __init__(self, path):
+    import sqlite3
+    self._db = sqlite3.connect(path)
+    self._db.execute("CREATE TABLE IF NOT EXISTS solutions (size TEXT NOT NULL, puzzle TEXT NOT NULL, solution TEXT, "
+                     "runtime REAL, generated INTEGER, discarded INTEGER, PRIMARY KEY (size, puzzle))")
+    self._db.commit()
+
+  def __len__(self):
+    return self._db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+  def get(self, size, puzzle):
+    """ Return [state, time, generated nodes, discarded nodes] recorded for the puzzle, with state == [] if it has no solution, or None if it is not stored."""
+    return self.getMany(size, [puzzle]).get(puzzle)
+
+  def getMany(self, size, puzzles):
+    """ Return the dictionary {puzzle: [state, time, generated nodes, discarded nodes]} of the stored puzzles among puzzles."""
+    puzzles = list(set(puzzles))
+    found = {}
+    for start in range(0, len(puzzles), self.BATCH):
+      batch = puzzles[start:start + self.BATCH]
+      rows = self._db.execute("SELECT puzzle, solution, runtime, generated, discarded FROM solutions WHERE size = ? AND puzzle IN (" +
+                              ','.join('?' * len(batch)) + ")", [size] + batch)
+      for puzzle, solution, runtime, generated, discarded in rows:
+        found[puzzle] = [[int(ch, 36) for ch in solution] if solution else [], runtime, generated, discarded]
+    return found
+
+  def put(self, size, puzzle, result):
+    """ Record result, [state, time, generated nodes, discarded nodes], for the puzzle."""
+    self.putMany(size, [(puzzle, result)])
+
+  def putMany(self, size, items):
+    """ Record the list of items (puzzle, [state, time, generated nodes, discarded nodes]) in one transaction."""
+    self._db.executemany("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?)",
+                         [(size, puzzle, ''.join(format_number(n) for n in result[0]) if result[0] else None, result[1], result[2], result[3])
+                          for puzzle, result in items])
+    self._db.commit()
+
+  def close(self):
+    self._db.close()
+
+
+class PuzzleCorpus:
+  """ A binary corpus of puzzles, which is opened via mmap so that a puzzle can be read by its index without parsing any text.
+  If the references (path, index) of PuzzleCorpus.references() are given to solve_many(), only they are sent to the worker processes,
+  every one of which maps the file once and reads the puzzles itself, so that the pages of the file are shared by the processes rather than copied.
+  The file has a header of 8 bytes, namely b'SDKC', the amount of rows and cols of a subset and two zero bytes,
+  followed by the records of the puzzles, each of which has one byte for every square, 0 for a blank square.
+  e.g. corpus = PuzzleCorpus('hard.sdk'); corpus[10] is the bytes of the 11th puzzle, which can be given to SudokuSolver.setPuzzle()."""
+
+  MAGIC = b'SDKC'
+  HEADER = 8
+
+  def __init__(self, path):
+    import mmap
+    self._path = os.path.abspath(path)
+    self._file = open(path, 'rb')
+    self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+    if self._map[:4] != self.MAGIC:
+      self.close()
+      raise TypeError("The file " + path + " is not a puzzle corpus.")
+    self._offset = (self._map[4], self._map[5])
+    size = self._offset[0] * self._offset[1]
+    self._record = size * size
+    self._count = (len(self._map) - self.HEADER) // self._record
+
+  @classmethod
+  def create(cls, path, puzzles, size = '3x3'):
+    """ Write the puzzle strings, in the format of SudokuSolver.setPuzzle() or read by read_puzzles(), into a corpus file at path.
+    Return the amount of puzzles written."""
+    side = size.split('x')
+    squares = (int(side[0]) * int(side[1])) ** 2
+    count = 0
+    with open(path, 'wb') as f:
+      f.write(cls.MAGIC + bytearray([int(side[0]), int(side[1]), 0, 0]))
+      for puzzle in puzzles:
+        puzzle = puzzle.strip()
+        if len(puzzle) != squares:
+          raise TypeError("A puzzle of %d"%len(puzzle) + " squares is given for a game of %d"%squares + " squares.")
+        f.write(bytearray(0 if c == '.' else int(c, 36) for c in puzzle))
+        count = count + 1
+    return count
+
+  def __len__(self):
+    return self._count
+
+  def __getitem__(self, index):
+    """ Return the bytes of the puzzle at index."""
+    if index < 0:
+      index = index + self._count
+    if index < 0 or index >= self._count:
+      raise IndexError("The puzzle %d"%index + " is not in the corpus.")
+    start = self.HEADER + index * self._record
+    return self._map[start:start + self._record]
+
+  def records(self, start = 0, stop = None):
+    """ Yield the bytes of the puzzles from start to stop (excluded), or to the end if stop is None."""
+    if stop is None or stop > self._count:
+      stop = self._count
+    for index in range(start, stop):
+      yield self[index]
+
+  def references(self, start = 0, stop = None):
+    """ Yield the references (path of the file, index) of the puzzles from start to stop (excluded), or to the end if stop is None,
+    which can be given to solve_many() instead of the bytes of the puzzles."""
+    if stop is None or stop > self._count:
+      stop = self._count
+    for index in range(start, stop):
+      yield (self._path, index)
+
+  def getSize(self):
+    """ Return the size of the games in the corpus, e.g. '3x3'."""
+    return "%d"%self._offset[0] + "x%d"%self._offset[1]
+
+  def close(self):
+    self._map.close()
+    self._file.close()
+
+
+# The solution cache of a worker process of solve_many(), which is kept across the puzzles solved by the process
+_worker_cache = None
+# The corpora mapped by a process for the references (path, index) given to solve_many(), which are opened once for every path
+_worker_corpora = {}
+
+def _read_puzzle(puzzle):
+  """ Return the bytes of the puzzle if it is a reference (path, index) of PuzzleCorpus.references(), otherwise return the puzzle."""
+  if isinstance(puzzle, tuple):
+    path, index = puzzle
+    if path not in _worker_corpora:
+      _worker_corpora[path] = PuzzleCorpus(path)
+    return _worker_corpora[path][index]
+  return puzzle
+
+def _solve_puzzle(task):
+  """ Solve one puzzle for solve_many(). This function is at the module level so that it can be sent to the worker processes."""
+  global _worker_cache
+  index, puzzle, size, method, settings = task
+  solver = SudokuSolver(size)
+  if settings.get('cache_size'):
+    if _worker_cache is None:
+      _worker_cache = SolutionCache(settings['cache_size'])
+    solver.setSolutionCache(_worker_cache)
+  solver.setPuzzle(_read_puzzle(puzzle))
+  solver.setPropagation(settings.get('propagation', 0))
+  solver.setForwardChecking(settings.get('forward_checking', False))
+  solver.setCompactNodes(settings.get('compact', False))
+  solver.setMemoryBudget(settings.get('memory_budget'))
+  return index, solver.solve(method, True, settings.get('strategy', 'bfs'))
+
+def solve_many(puzzles, workers = None, method = 2, size = '3x3', chunksize = 16, ordered = True, stats = None, store = None, **settings):
+  """ Solve many puzzle strings or bytes, in the format of SudokuSolver.setPuzzle(), using a pool of worker processes.
+  A puzzle can also be a reference (path, index) of PuzzleCorpus.references(), which is read by the worker process from its own map of the file.
+  The parameter workers is the amount of worker processes, which is the amount of CPUs by default; if workers == 1, no process is created.
+  The puzzles are sent to the workers in chunks of chunksize puzzles,
+  and at most 4 chunks for every worker are read from puzzles ahead, so that puzzles can be a generator of any length.
+  The parameter settings may have propagation, forward_checking, compact, memory_budget and strategy, which are passed to SudokuSolver,
+  and cache_size, the capacity of a SolutionCache kept by every worker process.
+  Yield (index of the puzzle, [state, time, generated nodes, discarded nodes]) for every puzzle,
+  in the order of puzzles if ordered is True, otherwise as soon as every puzzle is solved.
+  If stats is a dictionary, the amount of puzzles solved and having no solution, the total time and the total generated and discarded nodes are added to it.
+  If store is a SolutionStore, the puzzles of every window are looked up in it at once, and only the others are sent to the workers,
+  whose results are recorded into it, except "no solution" given by the beam search, which may miss solutions.
+  The statistics of a stored puzzle are those recorded, and stats['stored'] counts them."""
+  if stats is not None:
+    for key in ('solved', 'no_solution', 'time', 'generated', 'discarded', 'stored'):
+      stats.setdefault(key, 0)
+  tasks = ((index, puzzle.strip() if isinstance(puzzle, str) else puzzle, size, method, settings) for index, puzzle in enumerate(puzzles))
+  if store is not None:
+    # The puzzles are written in the same format as SudokuSolver.getPuzzle() to be looked up.
+    keys = SudokuSolver(size)
+  if workers is None:
+    workers = os.cpu_count() or 1
+  pool = None
+  if workers != 1:
+    import multiprocessing
+    pool = multiprocessing.Pool(workers)
+  try:
+    while True:
+      window = list(islice(tasks, workers * chunksize * 4))
+      if not window:
+        break
+      stored = {}
+      if store is not None:
+        puzzles = {}
+        for task in window:
+          keys.setPuzzle(_read_puzzle(task[1]))
+          puzzles[task[0]] = keys.getPuzzle()
+        found = store.getMany(size, puzzles.values())
+        stored = dict((index, found[puzzles[index]]) for index in puzzles if puzzles[index] in found)
+      pending = [task for task in window if task[0] not in stored]
+      if pool is None:
+        computed = map(_solve_puzzle, pending)
+      elif ordered:
+        computed = pool.imap(_solve_puzzle, pending, chunksize)
+      else:
+        computed = pool.imap_unordered(_solve_puzzle, pending, chunksize)
+      if ordered:
+        # The stored results are yielded in turn between the results of the workers.
+        results = ((task[0], stored[task[0]]) if task[0] in stored else next(computed) for task in window)
+      else:
+        results = chain(stored.items(), computed)
+      solved = []
+      for index, result in results:
+        if stats is not None:
+          stats['solved'] += 1
+          if result[0] == []:
+            stats['no_solution'] += 1
+          stats['time'] += result[1]
+          stats['generated'] += result[2]
+          stats['discarded'] += result[3]
+          if index in stored:
+            stats['stored'] += 1
+        if store is not None and index not in stored and (result[0] or method == 4 or settings.get('strategy') != 'beam'):
+          solved.append((puzzles[index], result))
+        yield index, result
+      if solved:
+        store.putMany(size, solved)
+  finally:
+    if pool is not None:
+      pool.terminate()
+
+def read_puzzles(source, size = '3x3'):
+  """ Yield the puzzle strings, in the format of SudokuSolver.setPuzzle(), read line by line from source,
+  which is a file name, '-' for stdin, or a file object. Blank lines and lines beginning with '#' are skipped.
+  A line has either one character for every square, e.g. "4...3.......6..8.. ...",
+  or the numbers of all squares separated by spaces or commas with 0 for a blank square, e.g. "0 6 4 0 0 5 0 0 0 0 ..."."""
+  side = size.split('x')
+  squares = (int(side[0]) * int(side[1])) ** 2
+  if source == '-':
+    lines = sys.stdin
+  elif isinstance(source, str):
+    lines = open(source)
+  else:
+    lines = source
+  try:
+    for line in lines:
+      line = line.strip()
+      if not line or line.startswith('#'):
+        continue
+      if len(line) != squares:
+        numbers = line.replace(',', ' ').split()
+        if len(numbers) != squares:
+          raise TypeError("A puzzle of %d"%len(numbers) + " squares is read for a game of %d"%squares + " squares.")
+        line = ''.join(format_number(int(n)) for n in numbers)
+      yield line
+  finally:
+    if isinstance(source, str) and source != '-':
+      lines.close()
+
+def format_number(number):
+  """ Return the character of the number in the format of SudokuSolver.setPuzzle(), '.' for 0."""
+  if number == 0:
+    return '.'
+  if number > 35:
+    raise TypeError("The number %d"%number + " cannot be written in a puzzle string.")
+  return '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'[number]
+
+def solve_stream(source, destination = '-', size = '3x3', workers = None, method = 2, store = None, **settings):
+  """ Solve the puzzles read by read_puzzles() from source, and write one JSON line for every puzzle to destination,
+  which is a file name, '-' for stdout, or a file object, in the order of the puzzles, e.g.
+    {"index": 0, "puzzle": "4...3...", "solution": "468931...", "runtime": 0.01, "generated": 120, "discarded": 40}
+  in which solution is null if the puzzle has no solution.
+  The puzzles are read, solved by solve_many() and written in a streaming way, so that any amount of puzzles can be solved.
+  If store is a SolutionStore, the puzzles stored in it are not solved again, see solve_many().
+  Return the statistics of solve_many()."""
+  stats = {}
+  puzzles, copies = tee(read_puzzles(source, size))
+  if destination == '-':
+    output = sys.stdout
+  elif isinstance(destination, str):
+    output = open(destination, 'w')
+  else:
+    output = destination
+  try:
+    for (index, result), puzzle in zip(solve_many(puzzles, workers, method, size, stats = stats, store = store, **settings), copies):
+      record = {
+        "index": index,
+        "puzzle": puzzle,
+        "solution": ''.join(format_number(n) for n in result[0]) if result[0] else None,
+        "runtime": result[1],
+        "generated": result[2],
+        "discarded": result[3],
+      }
+      output.write(json.dumps(record) + "\n")
+  finally:
+    if isinstance(destination, str) and destination != '-':
+      output.close()
+  return stats
+
+def load_big_data(difficulty):
+  """ Return the list of the 1465 hard sudoku games, if difficulty == 'hard', or the 1001 medium-hard sudoku games with 81 squares.
+  e.g. PuzzleCorpus.create('hard.sdk', load_big_data('hard')) writes them into a binary corpus."""
   
   hard_data = """4...3.......6..8..........1....5..9..8....6...7.2........1.27..5.3....4.9........
 7.8...3.....2.1...5.........4.....263...8.......1...9..9.6....4....7.5...........
@@ -3117,49 +4835,51 @@ def big_data_test(method, difficulty):
 ........4.....5.79.9..2.531....79....6.5.8....7....35......1....15.928.72..8.7.15
 25...7..1.....4.5..1..2.367...6.........81.3..8..4.7.662.1...7...94....88....6..3"""
 
-  time = 0.0
-  generated_nodes = 0
-  discarded_nodes = 0
-  solved = 0
-  no_solution = 0
-  
   if difficulty == 'hard':
-    data = hard_data.splitlines()
+    return hard_data.splitlines()
+  return medium_data.splitlines()
+
+def big_data_test(method, difficulty, workers = None, start = 0, stop = None, **settings):
+  """ This is a function to test 1465 hard sudoku games with 81 squares.
+  It will record the time used by the solver and the amount of the nodes generated and discarded.
+  The games are solved by solve_many() with the given amount of worker processes and settings.
+  The parameter difficulty is 'hard', 'medium', or the path of a PuzzleCorpus file,
+  and only the games from start to stop (excluded) are tested."""
+  size = '3x3'
+  if difficulty == 'hard' or difficulty == 'medium':
+    data = load_big_data(difficulty)[start:stop]
+    print("%d"%len(data) + " entries of data are loaded.")
   else:
-    data = medium_data.splitlines()
-    
-  print("%d"%len(data) + " entries of data are loaded.")
+    corpus = PuzzleCorpus(difficulty)
+    size = corpus.getSize()
+    data = corpus.references(start, stop)
+    print("%d"%len(corpus) + " entries of data are in the corpus.")
   
-  for d in data:
-    solver = SudokuSolver('3x3')
-    solver.showProgressRate(0)
-    if len(d) == 81:
-      s = d.replace('.', '0')
-      for i in range(81):
-        v = int(s[i])
-        if v != 0:
-          solver._restraints[i] = v
-    result = solver.solve(method, True)
-    solved = solved + 1
-    print("Finish %d"%solved + " puzzles already.")
-    if result[0] == []:
-      no_solution = no_solution + 1
-    time = time + result[1]
-    generated_nodes = generated_nodes + result[2]
-    discarded_nodes = discarded_nodes + result[3]
-    if d == 2:
-      break
+  stats = {}
+  start_time = time.perf_counter()
+  for index, result in solve_many(data, workers, method, size, ordered = False, stats = stats, **settings):
+    print("Finish %d"%stats['solved'] + " puzzles already.")
+  wall_time = time.perf_counter() - start_time
+  solved = stats['solved']
+  no_solution = stats['no_solution']
+  generated_nodes = stats['generated']
+  discarded_nodes = stats['discarded']
   
   if method == 1:
-    print("Order Method 1: Put numbers into squares in turn. i.e. from left to right, top to bottom.\n")
+    print("Order Method 1: Put numbers into squares according to the possible numbers of that squares.\n")
+  elif method == 3:
+    print("Order Method 3: Put numbers into the square having the fewest possible numbers in every node.\n")
+  elif method == 4:
+    print("Method 4: Solve the games as exact cover problems by Dancing Links.\n")
   else:
-    print("Order Method 2: Put numbers into squares according to the possible numbers of that squares.\n")
+    print("Order Method 2: Put numbers into squares in turn. i.e. from left to right, top to bottom.\n")
   print("Puzzles Solved: %d"%solved)
   print("Puzzles Found Solutions: %d"%(solved - no_solution))
   print("Total Nodes Generated: %d"%generated_nodes)
   print("Total Nodes Discarded: %d"%discarded_nodes)
-  print("Total Time Used: %f"%time + "s")
-  print("Average Time Used to Solve One Puzzle: %f"%(time/solved))
+  print("Total Time Used: %f"%stats['time'] + "s")
+  print("Wall Time Used: %f"%wall_time + "s")
+  print("Average Time Used to Solve One Puzzle: %f"%(stats['time']/solved))
   print("Average Nodes Generated/Discarded: %d"%(generated_nodes/solved) + "/%d"%(discarded_nodes/solved))
   
 if __name__ == "__main__":
@@ -3167,7 +4887,12 @@ if __name__ == "__main__":
   # This function will try to solve 1465 top hard sudoku games or 1001 medium-hard sudoku games with 81 squares via method 1 or 2, and record the time used by the solver and the amount of the nodes generated and discarded.
   # Method 1 means that the program will use the modfication (2) to BFS (Line 95) to decide the order of squares that will be put a number.
   # Mehtod 2 means that the program will generated nodes according to putting numbers from the left to right and top to bottom.
+  # Method 3 means that every node decides the next square by its own possible numbers, namely the modification (3) to BFS.
   # This function would take more than one day in my MacBook Pro 2012. So, take the time-consuming into your account before you run it.
+  # The games are solved by all CPUs. With the propagation and method 3, it takes only minutes, e.g. big_data_test(3, 'hard', propagation = 2)
   # big_data_test(1, 'hard')
   # big_data_test(2, 'medium')
+  # A slice of the games can be tested from a binary corpus, e.g.
+  # PuzzleCorpus.create('hard.sdk', load_big_data('hard'))
+  # big_data_test(3, 'hard.sdk', start = 100, stop = 200, propagation = 2)
   pass